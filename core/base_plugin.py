@@ -5,45 +5,232 @@ This module defines the standard interface that all assistant plugins must imple
 Plugins provide modular functionality for the wellness assistant and are dynamically
 loaded and executed based on user context.
 """
-from typing import Dict, List, Any
+import functools
+import logging
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
 
+logger = logging.getLogger(__name__)
 
-class AssistantPlugin:
+# Maximum number of memoized match_context results kept per plugin class
+MATCH_CACHE_SIZE = 1024
+
+try:
+    import numba
+
+    def cond_jit(func=None, **kwargs):
+        """
+        Apply numba.njit when Numba is installed, otherwise a no-op.
+
+        Lets plugins JIT-compile numeric scoring helpers (mood-trend
+        regressions and the like) without making Numba a hard dependency.
+        Decorated functions must be nopython-compatible — no dict indexing —
+        so extract scalars from user_context before calling into them.
+        """
+        if func is None:
+            return functools.partial(cond_jit, **kwargs)
+        kwargs.setdefault("cache", True)
+        return numba.njit(**kwargs)(func)
+
+except ImportError:
+    def cond_jit(func=None, **kwargs):
+        """
+        No-op fallback used when Numba is not installed.
+
+        Keeps plugin code importable and behaviorally identical, just
+        without the compilation speedup.
+        """
+        if func is None:
+            return lambda f: f
+        return func
+
+
+def register_plugin(cls):
+    """
+    Class decorator marking cls as its module's plugin.
+
+    Discovery then finds the plugin with a single attribute lookup on the
+    loaded module instead of scanning every name dir() returns through
+    getattr/isclass/issubclass. Modules that don't use the decorator are
+    still found by the old linear scan.
+
+    Args:
+        cls: The AssistantPlugin subclass to register
+
+    Returns:
+        The class, unchanged
+    """
+    module = sys.modules.get(cls.__module__)
+    if module is not None:
+        module._lifegoal_plugin = cls
+    return cls
+
+
+class AssistantPlugin(ABC):
     """
     Base class for all assistant plugins.
-    
+
     Plugins are modular extensions that provide specific functionality for the
     wellness assistant. Each plugin declares its purpose, required secrets,
     and implements methods for determining when it should be used and executing
     its logic.
     """
+    # The base class carries no per-instance state. Empty __slots__ keeps
+    # instances __dict__-free (smaller and faster to scan in the dispatch
+    # loop); subclasses that need instance state should declare their own
+    # __slots__ = ("field", ...) to keep that property.
+    __slots__ = ()
+
     plugin_id: str = "base"
     description: str = "Base plugin class"
-    required_secrets: List[str] = []
-    
+    # Subclasses may declare this as a plain list; __init_subclass__
+    # normalizes it to a frozenset of interned names so membership and
+    # subset tests against available secrets are O(1) hashed lookups
+    # shared across all instances.
+    required_secrets: FrozenSet[str] = frozenset()
+
+    # Context keys that must be present for this plugin to apply at all.
+    # The plugin manager builds an inverted index over these, so a plugin
+    # that requires e.g. "sleep_quality" is never even considered for a
+    # context that lacks it. Leave empty to always be considered.
+    required_context_keys: FrozenSet[str] = frozenset()
+
+    # Context keys this plugin's match_context actually reads. Subclasses that
+    # declare these get memoized matching: repeated dispatches with the same
+    # values for these keys skip the predicate entirely. Leave empty for
+    # plugins whose predicate depends on the full context.
+    context_keys: Tuple[str, ...] = ()
+
+    # Optional declarative prefilter: a list of (context_key, lo, hi) range
+    # checks that must all pass for the plugin to be considered. The plugin
+    # manager evaluates these for all plugins in one batch pass (vectorized
+    # when NumPy is available) before any match_context is called, so a
+    # plugin rejected here never pays a Python method call. A context value
+    # that is missing or non-numeric fails the check.
+    numeric_predicate: Optional[List[Tuple[str, float, float]]] = None
+
+    # Optional cheap prefilter run by the dispatcher before match_context.
+    # In a scan over many plugins the common case is "does not apply", so a
+    # tiny rejection test here skips the full predicate call for most
+    # plugins. Declare as a staticmethod taking the context dict and
+    # returning False to reject, e.g.
+    #     fast_reject = staticmethod(lambda ctx: "mood" in ctx)
+    fast_reject = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Validate subclass layout at class-creation time."""
+        super().__init_subclass__(**kwargs)
+
+        # Subclasses that skip __slots__ silently reintroduce a per-instance
+        # __dict__, losing the footprint win. Surface it so plugin authors
+        # can opt in deliberately.
+        if "__slots__" not in cls.__dict__:
+            logger.debug(
+                "Plugin class %s does not declare __slots__; instances will "
+                "carry a per-instance __dict__", cls.__name__
+            )
+
+        # Freeze declared secret names and context keys into interned,
+        # hashable containers shared on the type.
+        cls.required_secrets = frozenset(
+            sys.intern(s) for s in cls.required_secrets
+        )
+        cls.required_context_keys = frozenset(
+            sys.intern(k) for k in cls.required_context_keys
+        )
+        cls.context_keys = tuple(sys.intern(k) for k in cls.context_keys)
+
+    @staticmethod
+    def build_dispatch(plugins) -> Dict[str, Any]:
+        """
+        Build a {plugin_id: bound execute} dispatch table.
+
+        plugin_id is a class-level constant, so the table can be built once
+        per plugin set and each execution then costs a single dict lookup
+        and call instead of an attribute resolution per plugin per request.
+
+        Args:
+            plugins: Iterable of plugin instances
+
+        Returns:
+            Dictionary mapping plugin IDs to bound execute methods
+        """
+        return {plugin.plugin_id: plugin.execute for plugin in plugins}
+
+    @abstractmethod
     def match_context(self, user_context: Dict[str, Any]) -> bool:
         """
         Determine whether this plugin is applicable to the current user context.
-        
+
         Args:
             user_context: A dictionary containing current user data, such as
                         mood, goals, recent interactions, etc.
-                        
+
+        Returns:
+            True if the plugin should be triggered, False otherwise.
+        """
+        ...
+
+    def cached_match_context(self, user_context: Dict[str, Any]) -> bool:
+        """
+        Memoizing wrapper around match_context.
+
+        When the plugin declares context_keys, results are cached keyed by the
+        values of just those keys, so repeated dispatches against an unchanged
+        context slice return without re-running the predicate. Plugins with no
+        declared context_keys always fall through to match_context.
+
+        Args:
+            user_context: A dictionary containing current user data
+
         Returns:
             True if the plugin should be triggered, False otherwise.
         """
-        raise NotImplementedError("Plugin must implement match_context method")
-    
+        if not self.context_keys:
+            return self.match_context(user_context)
+
+        try:
+            key = (self.plugin_id,
+                   tuple(user_context.get(k) for k in self.context_keys))
+            hash(key)
+        except TypeError:
+            # Unhashable context values (lists, dicts) can't be cached
+            return self.match_context(user_context)
+
+        cls = type(self)
+        cache = cls.__dict__.get("_match_cache")
+        if cache is None:
+            cache = OrderedDict()
+            cls._match_cache = cache
+
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        result = self.match_context(user_context)
+
+        # Skip caching cheap negative results on narrow keys: the predicate
+        # is trivially re-derivable and the slot is better spent on hits.
+        if result or len(self.context_keys) > 1:
+            cache[key] = result
+            if len(cache) > MATCH_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return result
+
+    @abstractmethod
     def execute(self, context: Dict[str, Any], llm_registry: Any) -> Dict[str, Any]:
         """
         Execute the plugin's main functionality using the provided context.
-        
+
         Args:
             context: A dictionary containing user data and other relevant information
             llm_registry: A registry of available language models for AI processing
-            
+
         Returns:
             A dictionary containing the plugin's output, such as messages,
             recommendations, or data updates.
         """
-        raise NotImplementedError("Plugin must implement execute method")
\ No newline at end of file
+        ...
@@ -5,7 +5,15 @@ This module manages SQLite database operations using SQLAlchemy ORM, including
 downloading from and uploading to Google Cloud Storage. It ensures atomic state
 operations and proper versioning of the database.
 """
+import gzip
+import hashlib
 import os
+import random
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import tempfile
 import json
 import time
@@ -14,24 +22,88 @@ import socket
 from typing import Optional, Any, Dict, List, TypeVar, Type
 from datetime import datetime
 
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, func, select
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
+from sqlalchemy.pool import StaticPool
+from google.api_core.exceptions import GoogleAPIError, PreconditionFailed
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
 
 from core.models import (
     Base, User, CheckIn, Goal, PersonaVersion, 
-    PluginRegistry, Secret, Summary, OAuthToken, initialize_db
+    PluginRegistry, Secret, Summary, OAuthToken, configure_sqlite, initialize_db,
+    run_migrations
 )
 
 T = TypeVar('T')
 
+# Hot point-lookup queries, built once at import with bound parameters.
+# Each execution then reuses the already-constructed expression tree (and,
+# through the engine's shared compiled cache, its compiled SQL) instead of
+# rebuilding and recompiling the statement per call.
+_Q_RECENT_CHECKINS = (
+    select(CheckIn)
+    .where(CheckIn.user_id == bindparam("uid"))
+    .order_by(CheckIn.timestamp.desc())
+    .limit(bindparam("lim"))
+)
+_Q_USER_GOALS = (
+    select(Goal)
+    .where(Goal.user_id == bindparam("uid"))
+    .order_by(Goal.created_at.desc())
+)
+_Q_RECENT_SUMMARIES = (
+    select(Summary)
+    .where(Summary.user_id == bindparam("uid"))
+    .order_by(Summary.timestamp.desc())
+    .limit(bindparam("lim"))
+)
+_Q_OAUTH_TOKEN = select(OAuthToken).where(
+    OAuthToken.user_id == bindparam("uid"),
+    OAuthToken.provider == bindparam("prov"),
+)
+_Q_USER_OAUTH_TOKENS = select(OAuthToken).where(
+    OAuthToken.user_id == bindparam("uid")
+)
+# Column-only export query: returns plain Row tuples, skipping ORM
+# hydration (identity map, instrumentation, relationship setup) per row
+_Q_CHECKIN_EXPORT = (
+    select(CheckIn.id, CheckIn.timestamp, CheckIn.raw_input, CheckIn.structured_data)
+    .where(CheckIn.user_id == bindparam("uid"))
+    .order_by(CheckIn.timestamp)
+)
+
+# Compiled-SQL cache shared by every engine this module creates
+_COMPILED_CACHE: Dict[Any, Any] = {}
+
 # Maximum lock lifespan in seconds to prevent deadlocks
 MAX_LOCK_AGE = 300  # 5 minutes
 
-# Lock retry configuration
-LOCK_RETRY_ATTEMPTS = 5
-LOCK_RETRY_DELAY = 2  # seconds
+# Lock retry backoff configuration: waiters sleep a random interval in
+# [0, min(cap, base * 2**attempt)] so concurrent workers decorrelate
+# instead of all re-polling GCS on the same fixed schedule.
+LOCK_BACKOFF_BASE = 0.1  # seconds
+LOCK_BACKOFF_CAP = 5.0  # seconds
+
+# How often the lock holder refreshes the lock timestamp
+LOCK_HEARTBEAT_PERIOD = 30  # seconds
+
+# In-process read cache bounds: hot, rarely-changing reads (OAuth
+# tokens, active persona, plugin registry) are served from memory for up
+# to READ_CACHE_TTL seconds, skipping the whole lock/download/query
+# cycle on a hit. Local writes invalidate eagerly; the TTL bounds
+# staleness against writes from other processes.
+READ_CACHE_TTL = 60  # seconds
+READ_CACHE_SIZE = 1024
+
+# How many times an optimistic-mode transaction is replayed after losing
+# a generation race before giving up
+CAS_MAX_RETRIES = 3
+
+# Number of per-user lock shards. Operations scoped to a single user hash
+# their user_id onto one of these shards, so unrelated users stop queueing
+# behind one global lock object.
+LOCK_SHARDS = 8
 
 
 class DatabaseLockException(Exception):
@@ -44,7 +116,11 @@ class DatabaseLock:
     Context manager for database locking.
     
     This class provides a convenient way to acquire and release
-    database locks using Python's context manager protocol.
+    database locks using Python's context manager protocol. Locking and
+    uploading are decoupled: sessions opened under the lock re-upload
+    the database only when they actually changed something, so paths
+    that bail out early (no data to summarize, read-only probes) cost
+    zero bytes uploaded.
     
     Example:
     ```python
@@ -60,16 +136,20 @@ class DatabaseLock:
     ```
     """
     
-    def __init__(self, db_manager: 'DatabaseManager', timeout: int = 60):
+    def __init__(self, db_manager: 'DatabaseManager', timeout: int = 60,
+                 lock_key: Optional[str] = None):
         """
         Initialize the context manager.
         
         Args:
             db_manager: The DatabaseManager instance
             timeout: Maximum time in seconds to wait for the lock
+            lock_key: Optional key (typically a user_id) selecting a lock
+                    shard instead of the global lock
         """
         self.db_manager = db_manager
         self.timeout = timeout
+        self.lock_key = lock_key
     
     def __enter__(self) -> 'DatabaseManager':
         """
@@ -81,7 +161,7 @@ class DatabaseLock:
         Raises:
             DatabaseLockException: If unable to acquire the lock
         """
-        self.db_manager.acquire_lock(self.timeout)
+        self.db_manager.acquire_lock(self.timeout, lock_key=self.lock_key)
         return self.db_manager
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -93,7 +173,7 @@ class DatabaseLock:
             exc_val: Exception value if an exception was raised
             exc_tb: Exception traceback if an exception was raised
         """
-        self.db_manager.release_lock()
+        self.db_manager.release_lock(lock_key=self.lock_key)
 
 
 class DatabaseManager:
@@ -101,11 +181,15 @@ class DatabaseManager:
     Manages SQLite database operations using SQLAlchemy ORM, including GCS sync.
     """
     
+    # Shared worker pool so backup copies overlap with foreground work
+    _backup_executor = ThreadPoolExecutor(max_workers=2)
+    
     def __init__(self, 
                 bucket_name: str, 
                 db_filename: str = "lifegoal.db", 
                 local_path: Optional[str] = None,
-                lock_timeout: int = MAX_LOCK_AGE):
+                lock_timeout: int = MAX_LOCK_AGE,
+                concurrency_mode: str = "lock"):
         """
         Initialize the database manager.
         
@@ -114,24 +198,66 @@ class DatabaseManager:
             db_filename: Name of the SQLite database file
             local_path: Optional local path for the database file
             lock_timeout: Maximum time in seconds to hold a lock
+            concurrency_mode: "lock" serializes writers through GCS lock
+                            objects; "optimistic" skips lock files entirely
+                            and relies on generation-checked uploads,
+                            replaying the transaction on conflict
         """
         self.bucket_name = bucket_name
         self.db_filename = db_filename
         self.local_path = local_path or os.path.join(tempfile.gettempdir(), db_filename)
         self.engine = None
         self.Session = None
+        self._engine_path = None
         self.lock_timeout = lock_timeout
-        self.lock_id = None
-        
+        self.concurrency_mode = concurrency_mode
+        # Held locks keyed by lock blob name. The global lock and shard
+        # locks are independent objects, so one manager can legitimately
+        # hold several at once (each with its own id, generation and
+        # heartbeat); a flat slot here once let a nested acquisition
+        # clobber the state of a lock still held.
+        self._held_locks: Dict[str, Dict[str, Any]] = {}
+        self._db_generation = None
+        self._backup_future = None
+        self._read_cache = OrderedDict()
+
         # Initialize GCS client
         try:
             self.storage_client = storage.Client()
             self.bucket = self.storage_client.bucket(bucket_name)
+            self._configure_transport()
+            # Reuse one Blob handle per object; constructing a fresh one for
+            # every lock poll and download just churns allocations.
+            self._lock_blobs = {}
+            self._db_blob = self.bucket.blob(self.db_filename)
         except Exception as e:
             print(f"Warning: Failed to initialize GCS client: {e}")
             print("Operating in local-only mode")
             self.storage_client = None
             self.bucket = None
+            self._lock_blobs = {}
+            self._db_blob = None
+
+    def _configure_transport(self) -> None:
+        """
+        Mount a pooled, retrying HTTP adapter on the storage client.
+
+        The lock-polling loop issues many small requests in quick
+        succession; a keep-alive connection pool avoids paying TCP+TLS
+        setup on each one.
+        """
+        try:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=3, backoff_factor=0.2),
+            )
+            self.storage_client._http.mount("https://", adapter)
+        except Exception as e:
+            print(f"Warning: Could not configure pooled HTTP transport: {e}")
     
     def _generate_lock_id(self) -> str:
         """
@@ -148,54 +274,98 @@ class DatabaseManager:
         
         return f"{hostname}-{pid}-{unique_id}-{timestamp}"
     
-    def _get_lock_blob_name(self) -> str:
+    def _get_lock_blob_name(self, key: Optional[str] = None) -> str:
         """
         Get the name of the lock file in GCS.
         
+        Without a key this is the single global lock. With a key (typically
+        a user_id) the name is striped onto one of LOCK_SHARDS shard locks,
+        so writers touching different users' rows contend on different lock
+        objects.
+        
+        Args:
+            key: Optional key to hash onto a lock shard
+        
         Returns:
             The lock file name
         """
-        return f"{self.db_filename}.lock"
+        if key is None:
+            return f"{self.db_filename}.lock"
+        shard = int(hashlib.blake2b(key.encode(), digest_size=2).hexdigest(), 16) % LOCK_SHARDS
+        return f"{self.db_filename}.lock.{shard}"
     
-    def _lock_exists(self) -> bool:
+    def _get_lock_blob(self, key: Optional[str] = None):
         """
-        Check if a lock file exists in GCS.
+        Get (and cache) the Blob handle for a lock name.
+        
+        Args:
+            key: Optional key selecting a lock shard
         
         Returns:
-            True if a lock exists, False otherwise
+            The lock Blob, or None when no bucket is configured
         """
         if not self.bucket:
-            return False
-            
+            return None
+        name = self._get_lock_blob_name(key)
+        blob = self._lock_blobs.get(name)
+        if blob is None:
+            blob = self.bucket.blob(name)
+            self._lock_blobs[name] = blob
+        return blob
+    
+    def _snapshot_lock(self, blob):
+        """
+        Fetch lock existence, metadata and generation in one pass.
+
+        A single reload answers existence and supplies the generation; the
+        body is only downloaded when a lock is actually present and its
+        expiry needs parsing. Replaces the old exists/info/exists RPC
+        sequence per contention attempt.
+
+        Args:
+            blob: Lock Blob to inspect
+
+        Returns:
+            Tuple of (exists, lock info dict or None, generation or None)
+        """
+        if not self.bucket:
+            return (False, None, None)
+
         try:
-            lock_blob = self.bucket.blob(self._get_lock_blob_name())
-            return lock_blob.exists()
+            blob.reload()
+        except NotFound:
+            return (False, None, None)
         except Exception as e:
             print(f"Error checking for lock: {e}")
-            return False
-    
-    def _get_lock_info(self) -> Dict[str, Any]:
+            return (False, None, None)
+
+        lock_info = dict(blob.metadata or {})
+        if not lock_info:
+            # Pre-metadata locks carried their state as a JSON body
+            try:
+                lock_info = json.loads(blob.download_as_text())
+            except NotFound:
+                return (False, None, None)
+            except Exception as e:
+                print(f"Error getting lock info: {e}")
+                lock_info = {}
+
+        return (True, lock_info, blob.generation)
+
+    def _get_lock_info(self, lock_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Get information about the current lock.
-        
+
+        Args:
+            lock_key: Optional key selecting a lock shard
+
         Returns:
             Dictionary with lock information or empty dict if no lock
         """
         if not self.bucket:
             return {}
-            
-        try:
-            lock_blob = self.bucket.blob(self._get_lock_blob_name())
-            if not lock_blob.exists():
-                return {}
-                
-            # Download lock info
-            lock_data = lock_blob.download_as_text()
-            lock_info = json.loads(lock_data)
-            return lock_info
-        except Exception as e:
-            print(f"Error getting lock info: {e}")
-            return {}
+        _, lock_info, _ = self._snapshot_lock(self._get_lock_blob(lock_key))
+        return lock_info or {}
     
     def _is_lock_expired(self, lock_info: Dict[str, Any]) -> bool:
         """
@@ -223,169 +393,331 @@ class DatabaseManager:
             print(f"Error checking lock expiration: {e}")
             return True  # Assume expired if we can't parse the timestamp
     
-    def _create_lock(self) -> bool:
+    def _create_lock(self, blob) -> Optional[Dict[str, Any]]:
         """
-        Create a lock file in GCS.
-        
+        Atomically create a lock object in GCS.
+
+        The upload carries if_generation_match=0, so GCS rejects it in one
+        RPC when the lock object already exists. Two workers can no longer
+        both observe "no lock" and both write one.
+
+        Args:
+            blob: Lock Blob to create
+
         Returns:
-            True if the lock was created successfully, False otherwise
+            A held-lock record (blob, lock_id, generation, heartbeat
+            handles) on success, None otherwise
         """
-        if not self.bucket:
-            return True  # In local-only mode, pretend we got the lock
-            
         try:
             # Generate a unique lock ID for this process
-            self.lock_id = self._generate_lock_id()
-            
-            # Create lock info
-            lock_info = {
-                "lock_id": self.lock_id,
+            lock_id = self._generate_lock_id()
+
+            # Lock bookkeeping rides in custom metadata headers; the
+            # object body stays empty, so polls read the lock state from
+            # the metadata reload without downloading any payload.
+            blob.metadata = {
+                "lock_id": lock_id,
                 "timestamp": datetime.utcnow().isoformat(),
                 "hostname": socket.gethostname(),
-                "pid": os.getpid()
+                "pid": str(os.getpid()),
             }
-            
-            # Upload lock file to GCS
-            lock_blob = self.bucket.blob(self._get_lock_blob_name())
-            lock_blob.upload_from_string(json.dumps(lock_info))
-            
-            print(f"Created database lock: {self.lock_id}")
-            return True
+
+            # Atomic create-if-absent: fails if the object exists at all
+            blob.upload_from_string(b"", if_generation_match=0)
+            record = {
+                "blob": blob,
+                "lock_id": lock_id,
+                "generation": blob.generation,
+            }
+
+            print(f"Created database lock: {lock_id}")
+            self._start_heartbeat(record)
+            return record
+        except PreconditionFailed:
+            # Another process holds (or just created) the lock
+            return None
         except Exception as e:
             print(f"Error creating lock: {e}")
-            self.lock_id = None
-            return False
-    
-    def _release_lock(self) -> bool:
+            return None
+
+    def _start_heartbeat(self, record: Dict[str, Any],
+                         period: int = LOCK_HEARTBEAT_PERIOD) -> None:
         """
-        Release the database lock by deleting the lock file.
-        
+        Keep a held lock fresh with periodic metadata-only patches.
+
+        A transaction running longer than lock_timeout would otherwise be
+        judged expired and evicted by other waiters. Each tick rewrites
+        just the timestamp metadata under a generation precondition, so a
+        lock that has been taken over by another process is never touched.
+        Each held lock runs its own thread, stopped through the record's
+        stop event when that lock is released.
+
+        Args:
+            record: Held-lock record from _create_lock
+            period: Seconds between heartbeat ticks
+        """
+        stop = threading.Event()
+        record["stop"] = stop
+        blob = record["blob"]
+        lock_id = record["lock_id"]
+
+        def _beat():
+            while not stop.wait(period):
+                try:
+                    blob.reload()
+                    metadata = dict(blob.metadata or {})
+                    if metadata.get("lock_id") != lock_id:
+                        break
+                    metadata["timestamp"] = datetime.utcnow().isoformat()
+                    blob.metadata = metadata
+                    blob.patch(if_generation_match=blob.generation)
+                except (NotFound, PreconditionFailed):
+                    break
+                except Exception as e:
+                    print(f"Error refreshing lock heartbeat: {e}")
+
+        record["thread"] = threading.Thread(
+            target=_beat, daemon=True, name="db-lock-heartbeat"
+        )
+        record["thread"].start()
+
+    def _stop_heartbeat(self, record: Dict[str, Any]) -> None:
+        """Signal a held lock's heartbeat thread to exit."""
+        stop = record.get("stop")
+        if stop is not None:
+            stop.set()
+
+    def _release_lock(self, record: Dict[str, Any]) -> bool:
+        """
+        Release a held database lock by deleting its lock object.
+
+        Args:
+            record: Held-lock record from _create_lock
+
         Returns:
             True if the lock was released successfully, False otherwise
         """
-        if not self.bucket or not self.lock_id:
-            self.lock_id = None
+        self._stop_heartbeat(record)
+        if not self.bucket:
             return True
-            
+
         try:
-            # Check if we own the lock
-            lock_info = self._get_lock_info()
-            if lock_info.get("lock_id") != self.lock_id:
-                print("Warning: Not releasing lock as it's owned by another process")
-                self.lock_id = None
-                return False
-                
-            # Delete the lock file
-            lock_blob = self.bucket.blob(self._get_lock_blob_name())
-            lock_blob.delete()
-            
-            print(f"Released database lock: {self.lock_id}")
-            self.lock_id = None
+            # Deleting with the generation recorded at creation time means
+            # we can only ever remove the lock object we wrote, not one a
+            # later owner created after ours expired.
+            if record["generation"] is not None:
+                record["blob"].delete(if_generation_match=record["generation"])
+            else:
+                record["blob"].delete()
+
+            print(f"Released database lock: {record['lock_id']}")
             return True
+        except PreconditionFailed:
+            print("Warning: Not releasing lock as it's owned by another process")
+            return False
         except NotFound:
             # Lock already gone
-            self.lock_id = None
             return True
         except Exception as e:
             print(f"Error releasing lock: {e}")
-            self.lock_id = None
             return False
     
-    def _force_release_lock(self) -> bool:
+    def _force_release_lock(self, generation: Optional[int] = None,
+                            blob=None) -> bool:
         """
         Force release any existing lock, regardless of ownership.
         Only use in special cases like cleanup scripts.
-        
+
+        Args:
+            generation: If given, only delete the lock at this generation,
+                      so a lock re-created in the meantime survives
+            blob: Lock Blob to delete; defaults to the global lock
+
         Returns:
             True if the lock was released, False otherwise
         """
         if not self.bucket:
             return True
-            
+        if blob is None:
+            blob = self._get_lock_blob()
+
         try:
-            lock_blob = self.bucket.blob(self._get_lock_blob_name())
-            if lock_blob.exists():
-                lock_blob.delete()
-                print("Force-released database lock")
+            if generation is not None:
+                blob.delete(if_generation_match=generation)
+            else:
+                blob.delete()
+            print("Force-released database lock")
+            return True
+        except (NotFound, PreconditionFailed):
+            # Already gone, or someone else re-created it first
             return True
         except Exception as e:
             print(f"Error force-releasing lock: {e}")
             return False
     
-    def acquire_lock(self, timeout: int = 60) -> bool:
+    def acquire_lock(self, timeout: int = 60, lock_key: Optional[str] = None) -> bool:
         """
         Acquire a lock on the database with timeout.
         
+        With a lock_key, only the shard lock that key hashes to is taken,
+        so operations on unrelated users proceed in parallel. Shard locks
+        serialize writers of the same user's rows; cross-shard safety of
+        the shared database file relies on the generation-checked upload.
+        
         Args:
             timeout: Maximum time in seconds to wait for the lock
+            lock_key: Optional key (typically a user_id) selecting a lock
+                    shard instead of the global lock
             
         Returns:
             True if the lock was acquired, False otherwise
-            
+
         Raises:
-            DatabaseLockException: If unable to acquire the lock
+            DatabaseLockException: If unable to acquire the lock, or if
+                this manager already holds the requested lock
         """
         if not self.bucket:
             return True  # Local-only mode, no locking needed
-            
+
+        blob = self._get_lock_blob(lock_key)
+        # Holding the global lock alongside a shard lock (or two shards)
+        # is fine — each gets its own record — but re-acquiring a lock we
+        # already hold would only spin against ourselves until the
+        # timeout, so fail fast instead.
+        if blob.name in self._held_locks:
+            raise DatabaseLockException(
+                f"Lock {blob.name} is already held by this process"
+            )
+
         start_time = time.time()
         attempt = 0
-        
+
         while True:
             # Check if we've exceeded the timeout
             if time.time() - start_time > timeout:
                 raise DatabaseLockException(f"Failed to acquire database lock after {timeout} seconds")
-            
-            # Check if a lock exists
-            if not self._lock_exists():
-                # No lock exists, try to create one
-                if self._create_lock():
+
+            # Try the atomic create first: the uncontended happy path is a
+            # single RPC, with no separate existence probe.
+            record = self._create_lock(blob)
+            if record is not None:
+                self._held_locks[blob.name] = record
+                return True
+
+            # Creation lost the race; inspect the current holder for expiry
+            exists, lock_info, generation = self._snapshot_lock(blob)
+            if exists and self._is_lock_expired(lock_info):
+                print("Found expired lock, replacing it")
+                # Delete only the generation we inspected, then recreate
+                self._force_release_lock(generation, blob=blob)
+                record = self._create_lock(blob)
+                if record is not None:
+                    self._held_locks[blob.name] = record
                     return True
-            else:
-                # Lock exists, check if it's expired
-                lock_info = self._get_lock_info()
-                if self._is_lock_expired(lock_info):
-                    print("Found expired lock, replacing it")
-                    # Force-release the expired lock
-                    self._force_release_lock()
-                    # Try to create a new lock
-                    if self._create_lock():
-                        return True
-            
-            # Lock exists and is valid, wait and retry
+
+            # Lock exists and is valid: back off exponentially with full
+            # jitter. The wall-clock timeout at the top of the loop is the
+            # only termination condition, so contended waiters spread out
+            # instead of thundering against GCS in lock-step.
             attempt += 1
-            if attempt > LOCK_RETRY_ATTEMPTS:
-                owner = self._get_lock_info().get("lock_id", "unknown")
-                raise DatabaseLockException(
-                    f"Failed to acquire database lock after {attempt} attempts. "
-                    f"Currently held by: {owner}"
-                )
-            
-            # Wait before the next attempt
-            print(f"Database locked, waiting {LOCK_RETRY_DELAY} seconds (attempt {attempt}/{LOCK_RETRY_ATTEMPTS})")
-            time.sleep(LOCK_RETRY_DELAY)
+            delay = random.uniform(
+                0, min(LOCK_BACKOFF_CAP, LOCK_BACKOFF_BASE * (2 ** attempt))
+            )
+            print(f"Database locked, backing off {delay:.2f} seconds (attempt {attempt})")
+            time.sleep(delay)
+    
+    def release_lock(self, lock_key: Optional[str] = None) -> None:
+        """
+        Release the given lock if we hold it.
+
+        Args:
+            lock_key: Optional key (typically a user_id) selecting the
+                    lock shard to release; None releases the global lock
+        """
+        if not self.bucket:
+            return
+        name = self._get_lock_blob_name(lock_key)
+        record = self._held_locks.pop(name, None)
+        if record is not None:
+            self._release_lock(record)
+    
+    def _generation_path(self) -> str:
+        """Path of the sidecar file recording the last-synced blob generation."""
+        return f"{self.local_path}.gen"
+    
+    def _load_cached_generation(self) -> Optional[int]:
+        """
+        Read the blob generation the local database copy was synced at.
+        
+        Returns:
+            The cached generation number, or None if unknown
+        """
+        try:
+            with open(self._generation_path(), "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
     
-    def release_lock(self) -> None:
-        """Release the database lock if we hold it."""
-        if self.lock_id:
-            self._release_lock()
+    def _store_cached_generation(self, generation: Optional[int]) -> None:
+        """
+        Persist the blob generation the local database copy is synced at.
+        
+        Args:
+            generation: Generation number reported by GCS
+        """
+        if generation is None:
+            return
+        try:
+            with open(self._generation_path(), "w") as f:
+                f.write(str(generation))
+        except OSError as e:
+            print(f"Warning: could not persist database generation: {e}")
     
     def download_db(self) -> str:
         """
         Download the SQLite database from GCS.
         
+        The download is conditional: the generation of the last synced copy
+        is cached next to the local file, and when the live blob still has
+        that generation the multi-MB GET is skipped entirely (one metadata
+        reload instead).
+        
         Returns:
             Path to the local SQLite database file
         """
         if self.bucket:
             try:
-                blob = self.bucket.blob(self.db_filename)
-                if blob.exists():
-                    blob.download_to_filename(self.local_path)
-                    print(f"Downloaded database from GCS to {self.local_path}")
-                else:
+                try:
+                    self._db_blob.reload()
+                except NotFound:
                     print(f"No existing database found in GCS bucket. Creating a new one.")
+                    self._db_generation = None
                     self.initialize_db()
+                    return self.local_path
+                
+                # The in-memory generation (set after every download and
+                # upload from this process) is authoritative; the sidecar
+                # file only covers the first operation after a restart.
+                cached_generation = self._db_generation
+                if cached_generation is None:
+                    cached_generation = self._load_cached_generation()
+                if (cached_generation is not None
+                        and self._db_blob.generation == cached_generation
+                        and os.path.exists(self.local_path)):
+                    # Local copy already matches the live generation
+                    self._db_generation = self._db_blob.generation
+                    return self.local_path
+                
+                # A new blob generation is about to replace the database
+                # image; StaticPool's persistent connection still has the
+                # old file open and would read a swapped image as
+                # corruption. Drop the engine first — _ensure_engine
+                # rebuilds it lazily against the fresh copy.
+                self._dispose_engine()
+                self._db_blob.download_to_filename(self.local_path)
+                self._db_generation = self._db_blob.generation
+                self._store_cached_generation(self._db_blob.generation)
+                print(f"Downloaded database from GCS to {self.local_path}")
             except Exception as e:
                 print(f"Error downloading database from GCS: {e}")
                 if not os.path.exists(self.local_path):
@@ -404,27 +736,204 @@ class DatabaseManager:
             return
         
         try:
-            # Upload as latest version
-            blob = self.bucket.blob(self.db_filename)
-            blob.upload_from_filename(self.local_path)
-            
-            # Also create a timestamped version for backup
-            timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-            backup_blob = self.bucket.blob(f"backups/{self.db_filename}.{timestamp}")
-            backup_blob.upload_from_filename(self.local_path)
+            # Fold the WAL back into the main file first. With WAL
+            # journaling and StaticPool's single long-lived connection,
+            # committed rows otherwise sit only in the -wal sidecar —
+            # which is not uploaded — so the blob would silently miss
+            # every commit since the last autocheckpoint.
+            if self.engine is not None and self._engine_path == self.local_path:
+                try:
+                    with self.engine.connect() as conn:
+                        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+                except Exception as e:
+                    print(f"Warning: WAL checkpoint before upload failed: {e}")
+
+            # Compress before upload: SQLite files squeeze 3-5x, and GCS
+            # transparently decompresses on download thanks to the
+            # Content-Encoding header. Level 1 keeps CPU cost negligible.
+            # The lock blob stays uncompressed; its payload is tiny.
+            compressed_path = f"{self.local_path}.gz"
+            with open(self.local_path, "rb") as src, \
+                    gzip.open(compressed_path, "wb", compresslevel=1) as dst:
+                shutil.copyfileobj(src, dst)
             
+            try:
+                # Upload as latest version, but only if nobody else has
+                # written the blob since our download. Locks are sharded,
+                # so writers for different users legitimately run at the
+                # same time against the one shared blob; the generation
+                # precondition is what stops the last upload from erasing
+                # the first writer's rows. A mismatch surfaces as
+                # PreconditionFailed and with_session replays the
+                # transaction against the fresh state.
+                self._db_blob.content_encoding = "gzip"
+                self._db_blob.upload_from_filename(
+                    compressed_path,
+                    if_generation_match=self._db_generation or 0,
+                )
+            finally:
+                os.remove(compressed_path)
+            self._db_generation = self._db_blob.generation
+            self._store_cached_generation(self._db_blob.generation)
             print(f"Uploaded database to GCS: {self.bucket_name}/{self.db_filename}")
-            print(f"Created backup: {self.bucket_name}/backups/{self.db_filename}.{timestamp}")
             
+            # Timestamped backup via server-side copy, fired on the worker
+            # pool: nothing downstream depends on it, so the caller doesn't
+            # wait for the extra RPC. Any previous in-flight copy is drained
+            # first so at most one backup is outstanding.
+            self._wait_for_backup()
+            timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+            backup_name = f"backups/{self.db_filename}.{timestamp}"
+            self._backup_future = self._backup_executor.submit(
+                self._copy_backup, backup_name
+            )
+            
+        except PreconditionFailed:
+            # Lost a generation race; let with_session redownload and
+            # replay.
+            raise
         except Exception as e:
             print(f"Error uploading database to GCS: {e}")
     
+    def _dispose_engine(self) -> None:
+        """
+        Tear down the engine and session factory ahead of a file swap.
+
+        Closes StaticPool's persistent sqlite3 connection so nothing
+        holds the old database image open while download_db replaces it;
+        the next get_session rebuilds both via _ensure_engine.
+        """
+        if self.engine is None:
+            return
+        if self.Session is not None:
+            self.Session.remove()
+        self.engine.dispose()
+        self.engine = None
+        self.Session = None
+        self._engine_path = None
+
+    def _ensure_engine(self) -> None:
+        """
+        Create the engine and session factory once per database path.
+
+        Both are reused until the local file is replaced by a newer blob
+        generation (download_db disposes them first); rebuilding them on
+        every operation would churn sqlite3 connections and pool state.
+        StaticPool keeps one shared connection, relying on that disposal
+        to never outlive the database image it opened.
+        """
+        if self.engine is not None and self._engine_path == self.local_path:
+            return
+        
+        self.engine = configure_sqlite(create_engine(
+            f"sqlite:///{self.local_path}",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )).execution_options(compiled_cache=_COMPILED_CACHE)
+        # Bring pre-existing databases (the blob persists in GCS across
+        # deploys, so create_all never sees them) up to the current
+        # schema before any query runs against the engine.
+        run_migrations(self.engine)
+        # One scoped_session registry per engine, built here and only here.
+        # expire_on_commit=False keeps returned ORM objects readable after
+        # the commit without a re-query (they are handed back to callers
+        # once the session is gone).
+        self.Session = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+        self._engine_path = self.local_path
+    
+    def _copy_backup(self, backup_name: str) -> None:
+        """
+        Server-side copy the primary blob to a backup name.
+        
+        Args:
+            backup_name: Destination object name for the backup
+        """
+        try:
+            self.bucket.copy_blob(self._db_blob, self.bucket, backup_name)
+            print(f"Created backup: {self.bucket_name}/{backup_name}")
+        except GoogleAPIError as e:
+            print(f"Error creating backup copy: {e}")
+    
+    def _wait_for_backup(self) -> None:
+        """Block until any in-flight backup copy has finished."""
+        if self._backup_future is not None:
+            try:
+                self._backup_future.result()
+            except Exception as e:
+                print(f"Error in background backup: {e}")
+            self._backup_future = None
+    
+    def _cache_get(self, key) -> Optional[Any]:
+        """
+        Look up a read-cache entry, dropping it if its TTL has passed.
+        
+        Args:
+            key: Cache key tuple
+        
+        Returns:
+            The cached value, or None on miss/expiry
+        """
+        entry = self._read_cache.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.time() > expires:
+            del self._read_cache[key]
+            return None
+        self._read_cache.move_to_end(key)
+        return value
+    
+    def _cache_put(self, key, value) -> None:
+        """
+        Store a read-cache entry, evicting the least recently used on overflow.
+        
+        Args:
+            key: Cache key tuple
+            value: Value to cache
+        """
+        self._read_cache[key] = (time.time() + READ_CACHE_TTL, value)
+        self._read_cache.move_to_end(key)
+        if len(self._read_cache) > READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+    
+    def _cache_pop(self, key) -> None:
+        """
+        Invalidate a read-cache entry.
+
+        Args:
+            key: Cache key tuple
+        """
+        self._read_cache.pop(key, None)
+
+    @staticmethod
+    def _row_values(obj) -> Dict[str, Any]:
+        """
+        Copy an ORM row's mapped column values into a plain dict.
+
+        Cached rows outlive their session: a live instance becomes
+        detached once the scoped session is removed, and any relationship
+        or expired-attribute access on it raises DetachedInstanceError on
+        a later request. The read cache therefore stores these plain
+        values and cache hits hand back fresh transient instances built
+        from them instead of live ORM objects.
+
+        Args:
+            obj: Mapped ORM instance to copy
+
+        Returns:
+            Dictionary of column attribute names to values
+        """
+        return {attr.key: getattr(obj, attr.key)
+                for attr in obj.__mapper__.column_attrs}
+    
     def initialize_db(self) -> None:
         """
         Initialize a new SQLite database with the required schema.
         """
-        self.engine = initialize_db(self.local_path)
-        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        initialize_db(self.local_path)
+        self._ensure_engine()
     
     def get_session(self) -> Session:
         """
@@ -435,12 +944,11 @@ class DatabaseManager:
         """
         if not self.engine:
             self.download_db()
-            self.engine = create_engine(f"sqlite:///{self.local_path}")
-            self.Session = scoped_session(sessionmaker(bind=self.engine))
+        self._ensure_engine()
         
         return self.Session()
     
-    def with_session(self, func, *args, **kwargs):
+    def with_session(self, func, *args, read_only=False, lock_key=None, **kwargs):
         """
         Execute a function with a database session, handling download/upload.
         
@@ -450,6 +958,10 @@ class DatabaseManager:
         Args:
             func: Function to execute with the session
             *args: Arguments to pass to the function
+            read_only: Set for operations that don't mutate state; these
+                     skip the lock and never re-upload the database
+            lock_key: Optional key (typically a user_id) selecting a lock
+                     shard instead of the global lock
             **kwargs: Keyword arguments to pass to the function
             
         Returns:
@@ -458,8 +970,63 @@ class DatabaseManager:
         Raises:
             DatabaseLockException: If unable to acquire the database lock
         """
-        # Acquire the database lock
-        self.acquire_lock()
+        if read_only:
+            with self.session_scope(read_only=True, lock_key=lock_key) as session:
+                return func(session, *args, **kwargs)
+
+        # Writes upload with a generation precondition: a shard lock only
+        # serializes writers of the same key, and optimistic mode holds no
+        # lock at all, so another writer may ship the blob between our
+        # download and upload. On PreconditionFailed the local copy is
+        # stale; invalidate it, redownload and replay the callback
+        # against the fresh state.
+        for attempt in range(CAS_MAX_RETRIES):
+            try:
+                with self.session_scope(read_only=read_only, lock_key=lock_key) as session:
+                    return func(session, *args, **kwargs)
+            except PreconditionFailed:
+                print(f"Database changed underneath us, replaying (attempt {attempt + 1})")
+                self._db_generation = None
+                self._store_cached_generation(-1)
+        raise DatabaseLockException(
+            f"Gave up replaying transaction after {CAS_MAX_RETRIES} generation conflicts"
+        )
+    
+    @contextmanager
+    def session_scope(self, read_only: bool = False, lock_key: Optional[str] = None):
+        """
+        Hold one lock + download + session across several operations.
+        
+        Each public method pays a full acquire/download/upload cycle on its
+        own; callers doing several operations should batch them under one
+        scope so the GCS round-trips are paid once:
+        
+        ```python
+        with db_manager.session_scope() as session:
+            db_manager._store_checkin(session, user_id, text, data)
+            db_manager._create_goal(session, user_id, "sleep more")
+        ```
+        
+        Args:
+            read_only: Set for operations that don't mutate state; these
+                     skip the lock and never re-upload the database
+            lock_key: Optional key (typically a user_id) selecting a lock
+                     shard instead of the global lock
+        
+        Yields:
+            SQLAlchemy session
+        
+        Raises:
+            DatabaseLockException: If unable to acquire the database lock
+        """
+        # Read-only operations work against a consistent snapshot of the
+        # blob (GCS reads are strongly consistent), so they skip both the
+        # lock and the upload round-trips. Optimistic mode never takes a
+        # lock at all: conflicts are caught at upload time by the
+        # generation precondition.
+        take_lock = not read_only and self.concurrency_mode != "optimistic"
+        if take_lock:
+            self.acquire_lock(lock_key=lock_key)
         
         try:
             # Download the database and create a session
@@ -467,26 +1034,69 @@ class DatabaseManager:
             session = self.get_session()
             
             try:
-                # Execute the function with the session
-                result = func(session, *args, **kwargs)
+                yield session
+                # Check for pending mutations before commit clears them.
+                # Bulk Core inserts bypass the unit of work, so they flag
+                # themselves through session.info.
+                mutated = bool(session.new or session.dirty or session.deleted
+                               or session.info.get("bulk_mutation"))
                 # Commit changes
                 session.commit()
-                # Upload the updated database
-                self.upload_db()
-                return result
+                # Upload only when something actually changed
+                if not read_only and mutated:
+                    self.upload_db()
+                    # The lock protects the database object, which is
+                    # consistent as soon as the primary upload lands; the
+                    # backup copy runs on the worker pool outside the
+                    # critical section. Release here rather than in the
+                    # finally so waiters aren't held for the remainder of
+                    # the scope teardown.
+                    if take_lock:
+                        self.release_lock(lock_key)
             except Exception as e:
                 # Rollback changes on error
                 session.rollback()
                 print(f"Error in database operation: {e}")
                 raise
             finally:
-                # Close the session
-                session.close()
+                # Dispose of the session through the scoped_session
+                # registry rather than plain close(), so the registry
+                # doesn't keep handing back the stale thread-local session
+                self.Session.remove()
         finally:
-            # Always release the lock
-            self.release_lock()
+            # Always release the lock (a no-op when the post-upload
+            # release above already dropped it)
+            if take_lock:
+                self.release_lock(lock_key)
+    def _bulk_insert(self, session: Session, objs: List[Any]) -> None:
+        """Session-level variant of bulk_insert."""
+        if objs:
+            session.bulk_save_objects(objs, return_defaults=False)
+            session.info["bulk_mutation"] = True
+    
+    def bulk_insert(self, objs: List[Any]) -> None:
+        """
+        Insert many ORM objects in one batched statement.
+        
+        Groups the objects by mapper and runs executemany INSERTs instead
+        of a unit-of-work flush per row, so imports and seed data pay the
+        GCS round-trip and statement overhead once. The objects are not
+        attached to the session afterwards; use the type-specific bulk
+        methods (store_checkins, save_summaries) when the inserted rows
+        are needed back.
+        
+        Args:
+            objs: ORM model instances to insert
+        """
+        return self.with_session(self._bulk_insert, objs)
     
     # User operations
+    def _get_user_by_id(self, session: Session, user_id: str) -> Optional[User]:
+        """Session-level variant of get_user_by_id."""
+        # PK lookup: checks the session identity map first, so repeated
+        # fetches within one scope cost no SQL at all
+        return session.get(User, user_id)
+    
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """
         Get a user by ID.
@@ -497,10 +1107,14 @@ class DatabaseManager:
         Returns:
             User object or None if not found
         """
-        def _query(session):
-            return session.query(User).filter(User.id == user_id).first()
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_user_by_id, user_id, read_only=True)
+    
+    def _create_user(self, session: Session, name: Optional[str] = None, 
+                    email: Optional[str] = None) -> User:
+        """Session-level variant of create_user."""
+        user = User.create(name=name, email=email)
+        session.add(user)
+        return user
     
     def create_user(self, name: Optional[str] = None, email: Optional[str] = None) -> User:
         """
@@ -513,14 +1127,25 @@ class DatabaseManager:
         Returns:
             The created user
         """
-        def _create(session):
-            user = User.create(name=name, email=email)
+        return self.with_session(self._create_user, name, email)
+    
+    def _ensure_user(self, session: Session, user_id: str) -> User:
+        """Get a user by ID, creating a bare record if missing."""
+        user = session.get(User, user_id)
+        if not user:
+            user = User(id=user_id)
             session.add(user)
-            return user
-        
-        return self.with_session(_create)
+        return user
     
     # CheckIn operations
+    def _store_checkin(self, session: Session, user_id: str, raw_input: str, 
+                      structured_data: Dict[str, Any]) -> CheckIn:
+        """Session-level variant of store_checkin."""
+        self._ensure_user(session, user_id)
+        checkin = CheckIn.create(user_id=user_id, raw_input=raw_input, structured_data=structured_data)
+        session.add(checkin)
+        return checkin
+    
     def store_checkin(self, user_id: str, raw_input: str, structured_data: Dict[str, Any]) -> CheckIn:
         """
         Store a user check-in with raw input and structured data.
@@ -533,18 +1158,83 @@ class DatabaseManager:
         Returns:
             The created check-in
         """
-        def _store(session):
-            # Ensure user exists
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
-                user = User(id=user_id)
-                session.add(user)
+        return self.with_session(self._store_checkin, user_id, raw_input, structured_data, lock_key=user_id)
+    
+    def _store_checkins(self, session: Session, user_id: str,
+                       items: List[Dict[str, Any]]) -> List[CheckIn]:
+        """Session-level variant of store_checkins."""
+        self._ensure_user(session, user_id)
+        checkins = [
+            CheckIn.create(
+                user_id=user_id,
+                raw_input=item.get("raw_input", ""),
+                structured_data=item.get("structured_data", {})
+            )
+            for item in items
+        ]
+        rows = [
+            {
+                "id": checkin.id,
+                "user_id": checkin.user_id,
+                "raw_input": checkin.raw_input,
+                "structured_data": checkin.structured_data,
+            }
+            for checkin in checkins
+        ]
+        if rows:
+            session.execute(CheckIn.__table__.insert(), rows)
+            session.info["bulk_mutation"] = True
+        return checkins
+    
+    def store_checkins(self, user_id: str, items: List[Dict[str, Any]]) -> List[CheckIn]:
+        """
+        Store many check-ins for a user in one transaction.
+        
+        Amortizes the lock/download/upload cycle and uses a single
+        executemany INSERT instead of per-row ORM flushes.
+        
+        Args:
+            user_id: The user's unique identifier
+            items: List of dicts with "raw_input" and "structured_data" keys
             
-            checkin = CheckIn.create(user_id=user_id, raw_input=raw_input, structured_data=structured_data)
-            session.add(checkin)
-            return checkin
+        Returns:
+            List of the created CheckIn objects
+        """
+        return self.with_session(self._store_checkins, user_id, items, lock_key=user_id)
+    
+    def _get_recent_checkins(self, session: Session, user_id: str, limit: int = 5) -> List[CheckIn]:
+        """Session-level variant of get_recent_checkins."""
+        return session.execute(
+            _Q_RECENT_CHECKINS, {"uid": user_id, "lim": limit}
+        ).scalars().all()
+    
+    def stream_checkins(self, user_id: str, batch_size: int = 1000):
+        """
+        Stream a user's check-ins as lightweight Row tuples.
+        
+        Intended for bulk reads (exports, analytics) where ORM objects
+        are pure overhead: rows carry just (id, timestamp, raw_input,
+        structured_data) and are fetched in batches rather than
+        materialized all at once. The rows are read-only — they are not
+        tracked by the ORM, so mutating them changes nothing in the
+        database.
         
-        return self.with_session(_store)
+        Args:
+            user_id: The user's unique identifier
+            batch_size: Number of rows fetched per batch
+        
+        Yields:
+            Row tuples of (id, timestamp, raw_input, structured_data)
+        """
+        with self.session_scope(read_only=True) as session:
+            result = session.execute(
+                _Q_CHECKIN_EXPORT.execution_options(
+                    stream_results=True, yield_per=batch_size
+                ),
+                {"uid": user_id},
+            )
+            for row in result:
+                yield row
     
     def get_recent_checkins(self, user_id: str, limit: int = 5) -> List[CheckIn]:
         """
@@ -557,16 +1247,17 @@ class DatabaseManager:
         Returns:
             List of CheckIn objects
         """
-        def _query(session):
-            return session.query(CheckIn) \
-                .filter(CheckIn.user_id == user_id) \
-                .order_by(CheckIn.timestamp.desc()) \
-                .limit(limit) \
-                .all()
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_recent_checkins, user_id, limit, read_only=True)
     
     # Goal operations
+    def _create_goal(self, session: Session, user_id: str, name: str, 
+                    description: Optional[str] = None) -> Goal:
+        """Session-level variant of create_goal."""
+        self._ensure_user(session, user_id)
+        goal = Goal.create(user_id=user_id, name=name, description=description)
+        session.add(goal)
+        return goal
+    
     def create_goal(self, user_id: str, name: str, description: Optional[str] = None) -> Goal:
         """
         Create a new goal for a user.
@@ -579,18 +1270,11 @@ class DatabaseManager:
         Returns:
             The created goal
         """
-        def _create(session):
-            # Ensure user exists
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
-                user = User(id=user_id)
-                session.add(user)
-            
-            goal = Goal.create(user_id=user_id, name=name, description=description)
-            session.add(goal)
-            return goal
-        
-        return self.with_session(_create)
+        return self.with_session(self._create_goal, user_id, name, description, lock_key=user_id)
+    
+    def _get_user_goals(self, session: Session, user_id: str) -> List[Goal]:
+        """Session-level variant of get_user_goals."""
+        return session.execute(_Q_USER_GOALS, {"uid": user_id}).scalars().all()
     
     def get_user_goals(self, user_id: str) -> List[Goal]:
         """
@@ -602,13 +1286,14 @@ class DatabaseManager:
         Returns:
             List of Goal objects
         """
-        def _query(session):
-            return session.query(Goal) \
-                .filter(Goal.user_id == user_id) \
-                .order_by(Goal.created_at.desc()) \
-                .all()
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_user_goals, user_id, read_only=True)
+    
+    def _mark_goal_achieved(self, session: Session, goal_id: str) -> Optional[Goal]:
+        """Session-level variant of mark_goal_achieved."""
+        goal = session.get(Goal, goal_id)
+        if goal:
+            goal.mark_achieved()
+        return goal
     
     def mark_goal_achieved(self, goal_id: str) -> Optional[Goal]:
         """
@@ -620,15 +1305,15 @@ class DatabaseManager:
         Returns:
             The updated goal, or None if not found
         """
-        def _update(session):
-            goal = session.query(Goal).filter(Goal.id == goal_id).first()
-            if goal:
-                goal.mark_achieved()
-            return goal
-        
-        return self.with_session(_update)
+        return self.with_session(self._mark_goal_achieved, goal_id)
     
     # Persona operations
+    def _get_active_persona(self, session: Session) -> Optional[PersonaVersion]:
+        """Session-level variant of get_active_persona."""
+        # The partial unique index allows at most one active persona, so
+        # the cached-id PK lookup replaces the ordered filtered query
+        return PersonaVersion.get_active(session)
+    
     def get_active_persona(self) -> Optional[PersonaVersion]:
         """
         Get the currently active persona configuration.
@@ -636,13 +1321,34 @@ class DatabaseManager:
         Returns:
             Active PersonaVersion object, or None if not found
         """
-        def _query(session):
-            return session.query(PersonaVersion) \
-                .filter(PersonaVersion.is_active == True) \
-                .order_by(PersonaVersion.timestamp.desc()) \
-                .first()
-        
-        return self.with_session(_query)
+        cached = self._cache_get(("active_persona",))
+        if cached is not None:
+            return PersonaVersion(**cached)
+        persona = self.with_session(self._get_active_persona, read_only=True)
+        if persona is not None:
+            self._cache_put(("active_persona",), self._row_values(persona))
+        return persona
+    
+    def _create_persona_version(self, session: Session,
+                              name: str, 
+                              system_prompt: str, 
+                              user_behavior_summary: Optional[str] = None, 
+                              is_active: bool = False) -> PersonaVersion:
+        """Session-level variant of create_persona_version."""
+        if is_active:
+            # Deactivate all existing personas
+            existing_personas = session.query(PersonaVersion).filter(PersonaVersion.is_active == True).all()
+            for persona in existing_personas:
+                persona.is_active = False
+        
+        persona = PersonaVersion.create(
+            name=name, 
+            system_prompt=system_prompt,
+            user_behavior_summary=user_behavior_summary,
+            is_active=is_active
+        )
+        session.add(persona)
+        return persona
     
     def create_persona_version(self, 
                              name: str, 
@@ -661,25 +1367,31 @@ class DatabaseManager:
         Returns:
             The created persona version
         """
-        def _create(session):
-            if is_active:
-                # Deactivate all existing personas
-                existing_personas = session.query(PersonaVersion).filter(PersonaVersion.is_active == True).all()
-                for persona in existing_personas:
-                    persona.is_active = False
-            
-            persona = PersonaVersion.create(
-                name=name, 
-                system_prompt=system_prompt,
-                user_behavior_summary=user_behavior_summary,
-                is_active=is_active
-            )
-            session.add(persona)
-            return persona
-        
-        return self.with_session(_create)
+        self._cache_pop(("active_persona",))
+        return self.with_session(
+            self._create_persona_version, name, system_prompt,
+            user_behavior_summary, is_active
+        )
     
     # Plugin registry operations
+    def _register_plugin(self, session: Session, plugin_id: str, version: str, 
+                        description: Optional[str] = None) -> PluginRegistry:
+        """Session-level variant of register_plugin."""
+        plugin = session.get(PluginRegistry, plugin_id)
+        if plugin:
+            plugin.version = version
+            plugin.last_updated = datetime.utcnow()
+            if description:
+                plugin.description = description
+        else:
+            plugin = PluginRegistry.create(
+                plugin_id=plugin_id,
+                version=version,
+                description=description
+            )
+            session.add(plugin)
+        return plugin
+    
     def register_plugin(self, plugin_id: str, version: str, description: Optional[str] = None) -> PluginRegistry:
         """
         Register a new plugin or update an existing one.
@@ -692,23 +1404,13 @@ class DatabaseManager:
         Returns:
             The created or updated plugin registry entry
         """
-        def _register(session):
-            plugin = session.query(PluginRegistry).filter(PluginRegistry.plugin_id == plugin_id).first()
-            if plugin:
-                plugin.version = version
-                plugin.last_updated = datetime.utcnow()
-                if description:
-                    plugin.description = description
-            else:
-                plugin = PluginRegistry.create(
-                    plugin_id=plugin_id,
-                    version=version,
-                    description=description
-                )
-                session.add(plugin)
-            return plugin
-        
-        return self.with_session(_register)
+        self._cache_pop(("plugin_registry",))
+        return self.with_session(self._register_plugin, plugin_id, version, description)
+    
+    def _get_plugin_registry(self, session: Session) -> Dict[str, PluginRegistry]:
+        """Session-level variant of get_plugin_registry."""
+        plugins = session.query(PluginRegistry).all()
+        return {plugin.plugin_id: plugin for plugin in plugins}
     
     def get_plugin_registry(self) -> Dict[str, PluginRegistry]:
         """
@@ -717,13 +1419,32 @@ class DatabaseManager:
         Returns:
             Dictionary mapping plugin IDs to PluginRegistry objects
         """
-        def _query(session):
-            plugins = session.query(PluginRegistry).all()
-            return {plugin.plugin_id: plugin for plugin in plugins}
-        
-        return self.with_session(_query)
+        cached = self._cache_get(("plugin_registry",))
+        if cached is not None:
+            return {plugin_id: PluginRegistry(**values)
+                    for plugin_id, values in cached.items()}
+        registry = self.with_session(self._get_plugin_registry, read_only=True)
+        self._cache_put(
+            ("plugin_registry",),
+            {plugin_id: self._row_values(plugin)
+             for plugin_id, plugin in registry.items()},
+        )
+        return registry
     
     # Secret operations
+    def _track_secret(self, session: Session, name: str, 
+                     used_by: Optional[List[str]] = None) -> Secret:
+        """Session-level variant of track_secret."""
+        secret = session.get(Secret, name)
+        if secret:
+            if used_by:
+                for plugin_id in used_by:
+                    secret.add_plugin(plugin_id)
+        else:
+            secret = Secret.create(name=name, used_by=used_by)
+            session.add(secret)
+        return secret
+    
     def track_secret(self, name: str, used_by: Optional[List[str]] = None) -> Secret:
         """
         Track a secret required by plugins.
@@ -735,18 +1456,14 @@ class DatabaseManager:
         Returns:
             The created or updated secret
         """
-        def _track(session):
-            secret = session.query(Secret).filter(Secret.name == name).first()
-            if secret:
-                if used_by:
-                    for plugin_id in used_by:
-                        secret.add_plugin(plugin_id)
-            else:
-                secret = Secret.create(name=name, used_by=used_by)
-                session.add(secret)
-            return secret
-        
-        return self.with_session(_track)
+        return self.with_session(self._track_secret, name, used_by)
+    
+    def _mark_secret_present(self, session: Session, name: str) -> Optional[Secret]:
+        """Session-level variant of mark_secret_present."""
+        secret = session.get(Secret, name)
+        if secret:
+            secret.mark_present()
+        return secret
     
     def mark_secret_present(self, name: str) -> Optional[Secret]:
         """
@@ -758,13 +1475,11 @@ class DatabaseManager:
         Returns:
             The updated secret, or None if not found
         """
-        def _update(session):
-            secret = session.query(Secret).filter(Secret.name == name).first()
-            if secret:
-                secret.mark_present()
-            return secret
-        
-        return self.with_session(_update)
+        return self.with_session(self._mark_secret_present, name)
+    
+    def _get_missing_secrets(self, session: Session) -> List[Secret]:
+        """Session-level variant of get_missing_secrets."""
+        return session.query(Secret).filter(Secret.status == 'missing').all()
     
     def get_missing_secrets(self) -> List[Secret]:
         """
@@ -773,35 +1488,158 @@ class DatabaseManager:
         Returns:
             List of Secret objects
         """
-        def _query(session):
-            return session.query(Secret).filter(Secret.status == 'missing').all()
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_missing_secrets, read_only=True)
     
     # Summary operations
-    def save_summary(self, user_id: str, summary_data: Dict[str, Any]) -> Summary:
+    def _save_summary(self, session: Session, user_id: str, 
+                     summary_data: Dict[str, Any],
+                     content_hash: Optional[str] = None) -> Summary:
+        """Session-level variant of save_summary."""
+        self._ensure_user(session, user_id)
+        summary = Summary.create(user_id=user_id, summary_data=summary_data,
+                                 content_hash=content_hash)
+        session.add(summary)
+        return summary
+    
+    def save_summary(self, user_id: str, summary_data: Dict[str, Any],
+                     content_hash: Optional[str] = None) -> Summary:
         """
         Save a summary to the database.
         
         Args:
             user_id: The user's unique identifier
             summary_data: Dictionary containing the summary
+            content_hash: Optional hash of the inputs the summary was
+                        generated from, used to skip regeneration
             
         Returns:
             The created summary
         """
-        def _save(session):
-            # Ensure user exists
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
-                user = User(id=user_id)
-                session.add(user)
+        return self.with_session(self._save_summary, user_id, summary_data,
+                                 content_hash, lock_key=user_id)
+    
+    def _get_checkin_window_stats(self, session: Session, user_id: str,
+                                  since: datetime) -> tuple:
+        """Session-level variant of get_checkin_window_stats."""
+        return session.query(
+            func.count(CheckIn.id), func.max(CheckIn.timestamp)
+        ).filter(
+            CheckIn.user_id == user_id, CheckIn.timestamp >= since
+        ).one()
+    
+    def get_checkin_window_stats(self, user_id: str, since: datetime) -> tuple:
+        """
+        Count a user's check-ins in a window and find the newest one.
+        
+        Runs as one SQL aggregate, so deciding whether anything changed
+        costs a single row instead of ferrying the whole window into
+        Python.
+        
+        Args:
+            user_id: The user's unique identifier
+            since: Start of the window
             
-            summary = Summary.create(user_id=user_id, summary_data=summary_data)
-            session.add(summary)
-            return summary
+        Returns:
+            (count, newest timestamp or None) tuple
+        """
+        return self.with_session(
+            self._get_checkin_window_stats, user_id, since, read_only=True
+        )
+    
+    def _get_latest_summary(self, session: Session, user_id: str) -> Optional[Summary]:
+        """Session-level variant of get_latest_summary."""
+        return session.execute(
+            _Q_RECENT_SUMMARIES, {"uid": user_id, "lim": 1}
+        ).scalars().first()
+    
+    def get_latest_summary(self, user_id: str) -> Optional[Summary]:
+        """
+        Get the most recent summary for a user.
         
-        return self.with_session(_save)
+        Args:
+            user_id: The user's unique identifier
+            
+        Returns:
+            The latest Summary, or None if the user has none
+        """
+        return self.with_session(self._get_latest_summary, user_id, read_only=True)
+    
+    def _save_summaries(self, session: Session, user_id: str,
+                       summaries: List[Dict[str, Any]]) -> List[Summary]:
+        """Session-level variant of save_summaries."""
+        self._ensure_user(session, user_id)
+        objects = [
+            Summary.create(user_id=user_id, summary_data=summary_data)
+            for summary_data in summaries
+        ]
+        rows = [
+            {
+                "id": summary.id,
+                "user_id": summary.user_id,
+                "summary_data": summary.summary_data,
+            }
+            for summary in objects
+        ]
+        if rows:
+            session.execute(Summary.__table__.insert(), rows)
+            session.info["bulk_mutation"] = True
+        return objects
+    
+    def save_summaries(self, user_id: str, summaries: List[Dict[str, Any]]) -> List[Summary]:
+        """
+        Save many summaries for a user in one transaction.
+        
+        Args:
+            user_id: The user's unique identifier
+            summaries: List of summary dictionaries
+            
+        Returns:
+            List of the created Summary objects
+        """
+        return self.with_session(self._save_summaries, user_id, summaries, lock_key=user_id)
+    
+    def _save_summaries_bulk(self, session: Session,
+                             items: List[tuple]) -> List[Summary]:
+        """Session-level variant of save_summaries_bulk."""
+        for user_id in {user_id for user_id, _ in items}:
+            self._ensure_user(session, user_id)
+        objects = [
+            Summary.create(user_id=user_id, summary_data=summary_data)
+            for user_id, summary_data in items
+        ]
+        rows = [
+            {
+                "id": summary.id,
+                "user_id": summary.user_id,
+                "summary_data": summary.summary_data,
+            }
+            for summary in objects
+        ]
+        if rows:
+            session.execute(Summary.__table__.insert(), rows)
+            session.info["bulk_mutation"] = True
+        return objects
+    
+    def save_summaries_bulk(self, items: List[tuple]) -> List[Summary]:
+        """
+        Save summaries for many users in one transaction.
+        
+        Unlike save_summaries this spans users, so it takes the global
+        lock rather than a per-user shard.
+        
+        Args:
+            items: List of (user_id, summary_data) pairs
+            
+        Returns:
+            List of the created Summary objects
+        """
+        return self.with_session(self._save_summaries_bulk, items)
+    
+    def _get_recent_summaries(self, session: Session, user_id: str, limit: int = 5) -> List[Summary]:
+        """Session-level variant of get_recent_summaries."""
+        return session.execute(
+            _Q_RECENT_SUMMARIES, {"uid": user_id, "lim": limit}
+        ).scalars().all()
     
     def get_recent_summaries(self, user_id: str, limit: int = 5) -> List[Summary]:
         """
@@ -814,16 +1652,37 @@ class DatabaseManager:
         Returns:
             List of Summary objects
         """
-        def _query(session):
-            return session.query(Summary) \
-                .filter(Summary.user_id == user_id) \
-                .order_by(Summary.timestamp.desc()) \
-                .limit(limit) \
-                .all()
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_recent_summaries, user_id, limit, read_only=True)
     
     # OAuth token operations
+    def _store_oauth_token(self, session: Session,
+                          user_id: str, 
+                          provider: str, 
+                          token_data: Dict[str, Any], 
+                          expires_at: Optional[datetime] = None) -> OAuthToken:
+        """Session-level variant of store_oauth_token."""
+        # Check if a token already exists
+        token = session.execute(
+            _Q_OAUTH_TOKEN, {"uid": user_id, "prov": provider}
+        ).scalars().first()
+            
+        self._ensure_user(session, user_id)
+        
+        if token:
+            # Update existing token
+            token.update_tokens(token_data, expires_at)
+        else:
+            # Create new token
+            token = OAuthToken.create(
+                user_id=user_id,
+                provider=provider,
+                token_data=token_data,
+                expires_at=expires_at
+            )
+            session.add(token)
+            
+        return token
+    
     def store_oauth_token(self, 
                         user_id: str, 
                         provider: str, 
@@ -841,35 +1700,17 @@ class DatabaseManager:
         Returns:
             The created or updated OAuth token
         """
-        def _store(session):
-            # Check if a token already exists
-            token = session.query(OAuthToken) \
-                .filter(OAuthToken.user_id == user_id) \
-                .filter(OAuthToken.provider == provider) \
-                .first()
-                
-            # Ensure user exists
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
-                user = User(id=user_id)
-                session.add(user)
-            
-            if token:
-                # Update existing token
-                token.update_tokens(token_data, expires_at)
-            else:
-                # Create new token
-                token = OAuthToken.create(
-                    user_id=user_id,
-                    provider=provider,
-                    token_data=token_data,
-                    expires_at=expires_at
-                )
-                session.add(token)
-                
-            return token
-        
-        return self.with_session(_store)
+        self._cache_pop(("oauth_token", user_id, provider))
+        return self.with_session(
+            self._store_oauth_token, user_id, provider, token_data, expires_at,
+            lock_key=user_id
+        )
+    
+    def _get_oauth_token(self, session: Session, user_id: str, provider: str) -> Optional[OAuthToken]:
+        """Session-level variant of get_oauth_token."""
+        return session.execute(
+            _Q_OAUTH_TOKEN, {"uid": user_id, "prov": provider}
+        ).scalars().first()
     
     def get_oauth_token(self, user_id: str, provider: str) -> Optional[OAuthToken]:
         """
@@ -882,13 +1723,20 @@ class DatabaseManager:
         Returns:
             OAuthToken object or None if not found
         """
-        def _query(session):
-            return session.query(OAuthToken) \
-                .filter(OAuthToken.user_id == user_id) \
-                .filter(OAuthToken.provider == provider) \
-                .first()
-        
-        return self.with_session(_query)
+        cached = self._cache_get(("oauth_token", user_id, provider))
+        if cached is not None:
+            return OAuthToken(**cached)
+        token = self.with_session(self._get_oauth_token, user_id, provider, read_only=True)
+        if token is not None:
+            self._cache_put(("oauth_token", user_id, provider), self._row_values(token))
+        return token
+    
+    def _get_user_oauth_tokens(self, session: Session, user_id: str) -> Dict[str, OAuthToken]:
+        """Session-level variant of get_user_oauth_tokens."""
+        tokens = session.execute(
+            _Q_USER_OAUTH_TOKENS, {"uid": user_id}
+        ).scalars().all()
+        return {token.provider: token for token in tokens}
     
     def get_user_oauth_tokens(self, user_id: str) -> Dict[str, OAuthToken]:
         """
@@ -900,34 +1748,91 @@ class DatabaseManager:
         Returns:
             Dictionary mapping provider names to OAuthToken objects
         """
-        def _query(session):
-            tokens = session.query(OAuthToken) \
-                .filter(OAuthToken.user_id == user_id) \
-                .all()
-            return {token.provider: token for token in tokens}
-        
-        return self.with_session(_query)
+        return self.with_session(self._get_user_oauth_tokens, user_id, read_only=True)
     
+    def _delete_oauth_tokens(self, session: Session, user_id: str,
+                            providers: List[str]) -> int:
+        """Session-level variant of delete_oauth_tokens."""
+        deleted = session.query(OAuthToken) \
+            .filter(OAuthToken.user_id == user_id) \
+            .filter(OAuthToken.provider.in_(providers)) \
+            .delete(synchronize_session=False)
+        if deleted:
+            # Bulk DELETE bypasses the unit of work; flag the session so
+            # the upload-skip check still sees the mutation
+            session.info["bulk_mutation"] = True
+        return deleted
+
+    def _delete_oauth_token(self, session: Session, user_id: str, provider: str) -> bool:
+        """Session-level variant of delete_oauth_token."""
+        return self._delete_oauth_tokens(session, user_id, [provider]) > 0
+
     def delete_oauth_token(self, user_id: str, provider: str) -> bool:
         """
         Delete OAuth tokens for a user and provider.
-        
+
         Args:
             user_id: The user's unique identifier
             provider: Service provider name (e.g., 'google', 'microsoft')
-            
+
         Returns:
             True if a token was deleted, False otherwise
         """
-        def _delete(session):
-            token = session.query(OAuthToken) \
-                .filter(OAuthToken.user_id == user_id) \
-                .filter(OAuthToken.provider == provider) \
-                .first()
-                
-            if token:
-                session.delete(token)
-                return True
-            return False
-        
-        return self.with_session(_delete)
\ No newline at end of file
+        self._cache_pop(("oauth_token", user_id, provider))
+        return self.with_session(self._delete_oauth_token, user_id, provider, lock_key=user_id)
+
+    def delete_oauth_tokens(self, user_id: str, providers: List[str]) -> int:
+        """
+        Delete a user's OAuth tokens for several providers in one statement.
+
+        Args:
+            user_id: The user's unique identifier
+            providers: Service provider names to delete tokens for
+
+        Returns:
+            Number of tokens deleted
+        """
+        for provider in providers:
+            self._cache_pop(("oauth_token", user_id, provider))
+        return self.with_session(self._delete_oauth_tokens, user_id, providers, lock_key=user_id)
+
+    def _purge_expired_oauth_tokens(self, session: Session,
+                                   threshold: Optional[datetime] = None,
+                                   batch_size: int = 1000) -> int:
+        """Session-level variant of purge_expired_oauth_tokens."""
+        threshold = threshold or datetime.utcnow()
+        total = 0
+        while True:
+            # Chunked set-based DELETE: one statement per batch instead
+            # of a SELECT + DELETE per row, bounded so a huge backlog
+            # doesn't hold one giant write transaction
+            expired_ids = session.query(OAuthToken.id) \
+                .filter(OAuthToken.expires_at < threshold) \
+                .limit(batch_size) \
+                .all()
+            if not expired_ids:
+                break
+            deleted = session.query(OAuthToken) \
+                .filter(OAuthToken.id.in_([row[0] for row in expired_ids])) \
+                .delete(synchronize_session=False)
+            total += deleted
+            if deleted < batch_size:
+                break
+        if total:
+            session.info["bulk_mutation"] = True
+        return total
+
+    def purge_expired_oauth_tokens(self, threshold: Optional[datetime] = None) -> int:
+        """
+        Delete all OAuth tokens that expired before the threshold.
+
+        Args:
+            threshold: Cutoff datetime; defaults to now
+
+        Returns:
+            Number of tokens deleted
+        """
+        # Cheaper to drop the whole read cache than to enumerate which
+        # token entries the purge removed
+        self._read_cache.clear()
+        return self.with_session(self._purge_expired_oauth_tokens, threshold)
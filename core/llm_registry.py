@@ -5,9 +5,19 @@ This module defines a registry for Language Learning Models (LLMs) that can be
 dynamically selected based on task requirements. It enables the system to use
 the most appropriate AI model for each specific type of task.
 """
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+# Plugin-to-task-type routing, built once at import and frozen. Read-only
+# so every registry instance shares it without defensive copies; extend
+# here (or via configuration) rather than per call.
+_PLUGIN_MODEL_MAP = MappingProxyType({
+    "sleep_tracker": "summary",
+    "code_generator": "code",
+    "chatbot": "chat",
+})
+
 
 class LLMBase(ABC):
     """Base class for all language model wrappers."""
@@ -148,15 +158,20 @@ class LLMRegistry:
         Returns:
             An appropriate language model for the task
         """
-        if task_type in self.models:
-            return self.models[task_type]
-        return self.models["default"]
+        # Single hashed lookup with fallback, instead of a membership
+        # test followed by a second lookup
+        model = self.models.get(task_type)
+        if model is None:
+            model = self.models["default"]
+        return model
     
     def get_model_for_plugin(self, plugin_id: str) -> LLMBase:
         """
         Select the most appropriate model for a specific plugin.
         
         This allows plugins to have preferred models based on their functionality.
+        Routing comes from the frozen module-level _PLUGIN_MODEL_MAP, so no
+        per-call dict is built on this dispatch path.
         
         Args:
             plugin_id: The identifier of the plugin
@@ -164,16 +179,4 @@ class LLMRegistry:
         Returns:
             An appropriate language model for the plugin
         """
-        # Map plugin types to appropriate models
-        # This could be expanded to load from configuration
-        plugin_model_map = {
-            "sleep_tracker": "summary",
-            "code_generator": "code",
-            "chatbot": "chat",
-            # Add more mappings as needed
-        }
-        
-        if plugin_id in plugin_model_map:
-            return self.select_model(plugin_model_map[plugin_id])
-        
-        return self.models["default"]
\ No newline at end of file
+        return self.select_model(_PLUGIN_MODEL_MAP.get(plugin_id, "default"))
\ No newline at end of file
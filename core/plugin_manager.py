@@ -9,11 +9,24 @@ import os
 import importlib.util
 import json
 import inspect
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import logging
 
 from core.base_plugin import AssistantPlugin
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +35,17 @@ class PluginManager:
     Manages discovery, loading, and execution of assistant plugins.
     """
     
+    # Parsed registry.json keyed by path, validated by (mtime_ns, size):
+    # warm invocations reuse the parsed dict instead of re-reading and
+    # re-parsing identical bytes on every discovery pass
+    _registry_cache: Dict[str, tuple] = {}
+    
+    # Loaded plugin instances keyed by module path, validated by mtime:
+    # re-running exec_module per discovery is orders of magnitude more
+    # expensive than this dict lookup, and plugin files rarely change
+    # within a process lifetime
+    _module_cache: Dict[str, tuple] = {}
+    
     def __init__(self, plugins_dir: str = "plugins/user_generated"):
         """
         Initialize the plugin manager.
@@ -32,6 +56,13 @@ class PluginManager:
         self.plugins_dir = plugins_dir
         self.plugins = {}
         self.registry_path = os.path.join("plugins", "registry.json")
+        # While this deadline is in the future, the registry file is known
+        # to be absent and _load_registry skips even the stat
+        self._registry_missing_until = 0.0
+        self._numeric_index = None
+        self._context_index = None
+        self._active_signature = None
+        self._active_tuple = ()
     
     def discover_plugins(self) -> Dict[str, AssistantPlugin]:
         """
@@ -40,30 +71,180 @@ class PluginManager:
         Returns:
             Dictionary mapping plugin IDs to plugin instances
         """
-        plugins = {}
         registry = self._load_registry()
         
+        # Resolve every module path first (cheap directory work), then
+        # load the modules concurrently: exec_module blocks on disk reads
+        # and dependency imports, which release the GIL, so independent
+        # plugins genuinely overlap and cold-start discovery approaches
+        # the cost of the slowest plugin instead of the sum.
+        tasks = []
+        seen = set()
+        
         # First, check the registry for active plugins
         for plugin_id, metadata in registry.items():
             if metadata.get("is_active", True):
-                plugin_instance = self._load_plugin_from_registry(plugin_id, metadata)
-                if plugin_instance:
-                    plugins[plugin_id] = plugin_instance
+                version = metadata.get("version", "v1.py")
+                if not version.endswith(".py"):
+                    version += ".py"
+                tasks.append((plugin_id, os.path.join(self.plugins_dir, plugin_id, version)))
+                seen.add(plugin_id)
         
         # Scan directories for any plugins not in registry
         for plugin_dir in self._get_plugin_directories():
             plugin_id = os.path.basename(plugin_dir)
-            if plugin_id not in plugins:
+            if plugin_id not in seen:
                 latest_version = self._get_latest_version(plugin_dir)
                 if latest_version:
-                    plugin_instance = self._load_plugin_from_path(
-                        os.path.join(plugin_dir, latest_version)
-                    )
-                    if plugin_instance:
-                        plugins[plugin_id] = plugin_instance
+                    tasks.append((plugin_id, os.path.join(plugin_dir, latest_version)))
+                    seen.add(plugin_id)
+        
+        plugins = {}
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+                instances = executor.map(
+                    self._load_plugin_from_path, [path for _, path in tasks]
+                )
+                for (plugin_id, _), instance in zip(tasks, instances):
+                    if instance:
+                        plugins[plugin_id] = instance
+        elif tasks:
+            instance = self._load_plugin_from_path(tasks[0][1])
+            if instance:
+                plugins[tasks[0][0]] = instance
         
         self.plugins = plugins
+        self._build_numeric_index()
+        self._build_context_index()
         return plugins
+
+    def _build_numeric_index(self) -> None:
+        """
+        Precompute a structure-of-arrays index over all declared
+        numeric_predicate range checks.
+
+        Each (key, lo, hi) triple across all plugins becomes one row of four
+        parallel arrays (plugin index, key index, lo, hi), so the dispatcher
+        can evaluate every range check in a single batch comparison instead
+        of one Python call per plugin.
+        """
+        plugin_ids = []
+        keys = []
+        key_positions = {}
+        plugin_idx = []
+        key_idx = []
+        lows = []
+        highs = []
+
+        for plugin in self.plugins.values():
+            if not plugin.numeric_predicate:
+                continue
+            plugin_ids.append(plugin.plugin_id)
+            p = len(plugin_ids) - 1
+            for key, lo, hi in plugin.numeric_predicate:
+                if key not in key_positions:
+                    key_positions[key] = len(keys)
+                    keys.append(key)
+                plugin_idx.append(p)
+                key_idx.append(key_positions[key])
+                lows.append(float(lo))
+                highs.append(float(hi))
+
+        if not plugin_ids:
+            self._numeric_index = None
+            return
+
+        if np is not None:
+            plugin_idx = np.asarray(plugin_idx, dtype=np.intp)
+            key_idx = np.asarray(key_idx, dtype=np.intp)
+            lows = np.asarray(lows)
+            highs = np.asarray(highs)
+
+        self._numeric_index = {
+            "plugin_ids": plugin_ids,
+            "keys": keys,
+            "plugin_idx": plugin_idx,
+            "key_idx": key_idx,
+            "lo": lows,
+            "hi": highs,
+        }
+
+    def _build_context_index(self) -> None:
+        """
+        Build an inverted index over declared required_context_keys.
+
+        Maps each declared key to the plugins requiring it, so matching
+        can restrict the candidate set to plugins whose keys actually
+        appear in the context before any match_context runs. Plugins
+        that declare no required keys are always candidates.
+        """
+        by_key = {}
+        keyed = False
+        for plugin in self.plugins.values():
+            for key in plugin.required_context_keys:
+                by_key.setdefault(key, []).append(plugin)
+                keyed = True
+        self._context_index = by_key if keyed else None
+
+    def active_plugins(self) -> tuple:
+        """
+        Get the current plugin set as an immutable tuple.
+
+        The set of loaded plugins changes on discovery or registry update,
+        not per request, so the dispatch loop iterates a cached tuple
+        (rebuilt only when the plugin ids change) rather than building a
+        fresh view of the plugins dict every time.
+
+        Returns:
+            Tuple of plugin instances
+        """
+        signature = tuple(self.plugins)
+        if signature != self._active_signature:
+            self._active_signature = signature
+            self._active_tuple = tuple(self.plugins.values())
+        return self._active_tuple
+
+    def _evaluate_numeric_predicates(self, context: Dict[str, Any]) -> Dict[str, bool]:
+        """
+        Evaluate all declared numeric_predicate checks in one batch pass.
+
+        Args:
+            context: User context dictionary
+
+        Returns:
+            Dictionary mapping plugin IDs (of plugins that declare a
+            numeric predicate) to whether all their range checks passed
+        """
+        index = self._numeric_index
+        if not index:
+            return {}
+
+        # Extract each referenced context value once; missing or
+        # non-numeric values fail every range check against them.
+        values = []
+        for key in index["keys"]:
+            try:
+                values.append(float(context.get(key)))
+            except (TypeError, ValueError):
+                values.append(float("nan"))
+
+        plugin_ids = index["plugin_ids"]
+
+        if np is not None:
+            vals = np.asarray(values)[index["key_idx"]]
+            ok = (vals >= index["lo"]) & (vals <= index["hi"])
+            failures = np.bincount(
+                index["plugin_idx"][~ok], minlength=len(plugin_ids)
+            )
+            return {pid: failures[p] == 0 for p, pid in enumerate(plugin_ids)}
+
+        passed = [True] * len(plugin_ids)
+        for p, k, lo, hi in zip(index["plugin_idx"], index["key_idx"],
+                                index["lo"], index["hi"]):
+            value = values[k]
+            if not (lo <= value <= hi):
+                passed[p] = False
+        return {pid: passed[p] for p, pid in enumerate(plugin_ids)}
     
     def _get_plugin_directories(self) -> List[str]:
         """
@@ -72,15 +253,18 @@ class PluginManager:
         Returns:
             List of directory paths
         """
-        if not os.path.exists(self.plugins_dir):
+        # scandir surfaces the entry type from the directory read itself,
+        # so no per-entry stat is needed; a missing plugins dir is caught
+        # from scandir directly instead of paying a separate exists() stat.
+        try:
+            with os.scandir(self.plugins_dir) as entries:
+                return [
+                    entry.path for entry in entries
+                    if not entry.name.startswith("__")
+                    and entry.is_dir(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
             return []
-            
-        plugin_dirs = []
-        for item in os.listdir(self.plugins_dir):
-            item_path = os.path.join(self.plugins_dir, item)
-            if os.path.isdir(item_path) and not item.startswith("__"):
-                plugin_dirs.append(item_path)
-        return plugin_dirs
     
     def _get_latest_version(self, plugin_dir: str) -> Optional[str]:
         """
@@ -92,35 +276,25 @@ class PluginManager:
         Returns:
             Filename of the latest version, or None if no versions are found
         """
-        versions = []
-        for item in os.listdir(plugin_dir):
-            if item.endswith(".py") and item.startswith("v") and not item.startswith("__"):
-                versions.append(item)
-        
-        if not versions:
-            return None
-            
-        # Sort versions (assuming naming convention like v1.py, v2.py, etc.)
-        versions.sort(key=lambda v: int(v[1:-3]))
-        return versions[-1]
-    
-    def _load_plugin_from_registry(self, plugin_id: str, metadata: Dict[str, Any]) -> Optional[AssistantPlugin]:
-        """
-        Load a plugin based on registry metadata.
-        
-        Args:
-            plugin_id: The plugin's identifier
-            metadata: Registry metadata for the plugin
-            
-        Returns:
-            Plugin instance or None if loading fails
-        """
-        version = metadata.get("version", "v1.py")
-        if not version.endswith(".py"):
-            version += ".py"
-            
-        module_path = os.path.join(self.plugins_dir, plugin_id, version)
-        return self._load_plugin_from_path(module_path)
+        # Single scandir pass tracking the max version number: no list
+        # materialization, no sort, and no per-entry stat. Assumes the
+        # naming convention v1.py, v2.py, etc.
+        best = None
+        best_version = -1
+        with os.scandir(plugin_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.endswith(".py") and name.startswith("v")
+                        and not name.startswith("__")):
+                    continue
+                try:
+                    version = int(name[1:-3])
+                except ValueError:
+                    continue
+                if version > best_version:
+                    best_version = version
+                    best = name
+        return best
     
     def _load_plugin_from_path(self, module_path: str) -> Optional[AssistantPlugin]:
         """
@@ -133,22 +307,53 @@ class PluginManager:
             Plugin instance or None if loading fails
         """
         try:
-            module_name = os.path.basename(module_path)[:-3]  # Remove .py
+            mtime_ns = os.stat(module_path).st_mtime_ns
+            cached = self._module_cache.get(module_path)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+            
+            # Qualify the name with the plugin directory: version files
+            # all share names like "v1", and concurrent loads must not
+            # collide on the same sys.modules key
+            base_name = os.path.basename(module_path)[:-3]  # Remove .py
+            parent = os.path.basename(os.path.dirname(module_path))
+            module_name = f"{parent}_{base_name}" if parent else base_name
             spec = importlib.util.spec_from_file_location(module_name, module_path)
             if not spec or not spec.loader:
                 logger.error(f"Failed to load spec for plugin: {module_path}")
                 return None
                 
             module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            # Registered in sys.modules during execution so the
+            # @register_plugin decorator can see its own module; removed
+            # again afterwards since version files all share names like "v1"
+            preexisting = module_name in sys.modules
+            if not preexisting:
+                sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            finally:
+                if not preexisting:
+                    sys.modules.pop(module_name, None)
+            
+            # Fast path: modules using @register_plugin (or declaring
+            # PLUGIN_CLASS) hand us the class in one attribute lookup
+            plugin_cls = (getattr(module, "_lifegoal_plugin", None)
+                          or getattr(module, "PLUGIN_CLASS", None))
+            if plugin_cls is not None:
+                instance = plugin_cls()
+                self._module_cache[module_path] = (mtime_ns, instance)
+                return instance
             
-            # Find the plugin class (subclass of AssistantPlugin)
+            # Fallback: linear scan for a subclass of AssistantPlugin
             for attr_name in dir(module):
                 attr = getattr(module, attr_name)
                 if (inspect.isclass(attr) and 
                     issubclass(attr, AssistantPlugin) and 
                     attr != AssistantPlugin):
-                    return attr()
+                    instance = attr()
+                    self._module_cache[module_path] = (mtime_ns, instance)
+                    return instance
             
             logger.error(f"No valid plugin class found in {module_path}")
             return None
@@ -164,15 +369,38 @@ class PluginManager:
         Returns:
             Dictionary containing plugin registry data
         """
-        if not os.path.exists(self.registry_path):
+        if time.monotonic() < self._registry_missing_until:
             return {}
         
+        # One os.open serves both the freshness check and the read: the
+        # fstat on the already-open fd replaces the separate stat, and a
+        # raw os.read of a small file skips Python's buffered-reader
+        # layer entirely (the parsers take bytes directly)
+        try:
+            fd = os.open(self.registry_path, os.O_RDONLY)
+        except OSError:
+            # Negative-cache the miss briefly so repeated discovery calls
+            # don't re-pay an ENOENT stat for a file that isn't there
+            self._registry_missing_until = time.monotonic() + 5.0
+            return {}
+        
+        try:
+            stat = os.fstat(fd)
+            cached = self._registry_cache.get(self.registry_path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+            raw = os.read(fd, stat.st_size)
+        finally:
+            os.close(fd)
+        
         try:
-            with open(self.registry_path, "r") as f:
-                return json.load(f)
+            data = orjson.loads(raw) if orjson else json.loads(raw)
         except Exception as e:
             logger.error(f"Failed to load plugin registry: {e}")
             return {}
+        
+        self._registry_cache[self.registry_path] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
     
     def _update_registry(self) -> None:
         """
@@ -190,8 +418,26 @@ class PluginManager:
         
         os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
         
-        with open(self.registry_path, "w") as f:
-            json.dump(registry, f, indent=2)
+        # orjson encodes to bytes in C in one shot; the stdlib encoder is
+        # the fallback when it isn't installed
+        if orjson:
+            payload = orjson.dumps(registry, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(registry, indent=2).encode()
+        with open(self.registry_path, "wb") as f:
+            f.write(payload)
+        
+        self._registry_missing_until = 0.0
+        
+        # Re-prime the cache with the dict just written so the next load
+        # doesn't even need to re-parse our own output
+        try:
+            stat = os.stat(self.registry_path)
+            self._registry_cache[self.registry_path] = (
+                stat.st_mtime_ns, stat.st_size, registry
+            )
+        except OSError:
+            self._registry_cache.pop(self.registry_path, None)
     
     def get_plugin_by_id(self, plugin_id: str) -> Optional[AssistantPlugin]:
         """
@@ -216,10 +462,33 @@ class PluginManager:
             List of plugin instances that match the context
         """
         matching_plugins = []
-        
-        for plugin in self.plugins.values():
+        numeric_pass = self._evaluate_numeric_predicates(context)
+
+        # Restrict the scan through the inverted key index: plugins with
+        # declared required_context_keys are only candidates when at
+        # least one of those keys appears in the context, so their
+        # predicates never run for contexts that can't satisfy them.
+        by_key = self._context_index
+        candidates = None
+        if by_key is not None:
+            candidates = set()
+            for key in context:
+                bucket = by_key.get(key)
+                if bucket:
+                    candidates.update(id(p) for p in bucket)
+
+        for plugin in self.active_plugins():
+            if (candidates is not None and plugin.required_context_keys
+                    and id(plugin) not in candidates):
+                continue
+            if not numeric_pass.get(plugin.plugin_id, True):
+                continue
+            # Read off the class so a plain function is not bound as a method
+            fast_reject = type(plugin).fast_reject
+            if fast_reject is not None and not fast_reject(context):
+                continue
             try:
-                if plugin.match_context(context):
+                if plugin.cached_match_context(context):
                     matching_plugins.append(plugin)
             except Exception as e:
                 logger.error(f"Error in plugin {plugin.plugin_id} match_context: {e}")
@@ -5,11 +5,13 @@ This Cloud Function handles incoming webhook events from Slack,
 processes user interactions, and generates appropriate responses.
 """
 import os
-import hmac
 import hashlib
+import hmac
 import json
 import time
 import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple, List, Union
 
 # Core imports 
@@ -19,11 +21,76 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from google.cloud import secretmanager
 from google.cloud import storage
 
+from core.base_plugin import AssistantPlugin
 from core.db_manager import DatabaseManager
 from core.llm_registry import LLMRegistry
 from core.plugin_manager import PluginManager
 from core.models import User, CheckIn, Goal
-from core.db_manager import DatabaseLock
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson parses straight from the bytes buffer several times faster
+# than the stdlib; json.loads also accepts bytes, so the fallback keeps
+# the same zero-decode call shape
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """
+    Serialize obj to indented JSON for LLM prompts.
+    
+    Args:
+        obj: The object to serialize
+        
+    Returns:
+        Two-space-indented JSON as a string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+# Pretty-printed recent-history JSON keyed by (user_id, content hash):
+# a user's history only changes when they check in, so consecutive
+# turns reuse the formatted block instead of re-indenting it
+_RD_JSON_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_RD_JSON_CACHE_SIZE = 128
+
+
+def _recent_data_json(user_id: str, recent_data: List[Dict[str, Any]]) -> str:
+    """
+    Get the prompt JSON for a user's recent check-in data, memoized.
+    
+    Args:
+        user_id: The user's Slack ID
+        recent_data: Parsed data from the user's recent check-ins
+        
+    Returns:
+        Two-space-indented JSON as a string
+    """
+    try:
+        if orjson is not None:
+            raw = orjson.dumps(recent_data)
+        else:
+            raw = json.dumps(recent_data).encode()
+        key = (user_id, hashlib.blake2b(raw, digest_size=16).digest())
+    except TypeError:
+        # Non-serializable content can't be hashed for reuse either
+        return _dumps_pretty(recent_data)
+    
+    cached = _RD_JSON_CACHE.get(key)
+    if cached is not None:
+        _RD_JSON_CACHE.move_to_end(key)
+        return cached
+    
+    pretty = _dumps_pretty(recent_data)
+    _RD_JSON_CACHE[key] = pretty
+    if len(_RD_JSON_CACHE) > _RD_JSON_CACHE_SIZE:
+        _RD_JSON_CACHE.popitem(last=False)
+    return pretty
 
 
 # Configuration
@@ -31,8 +98,122 @@ PROJECT_ID = os.environ.get("PROJECT_ID", "")
 GCS_BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME", "lifegoal-data")
 DB_NAME = os.environ.get("DB_NAME", "lifegoal.db")
 
-# Secret cache to avoid repeated Secret Manager calls
+# Secret cache to avoid repeated Secret Manager calls; values are
+# (secret, expiry) pairs on a monotonic clock so rotated secrets are
+# picked up within _SECRET_TTL seconds instead of never
 _secret_cache = {}
+_SECRET_TTL = 300
+
+# Last-seen signing secret and its encoded form, so signature checks
+# don't re-encode the key on every request
+_signing_key_cache: Tuple[str, bytes] = ("", b"")
+
+
+def _signing_key(secret: str) -> bytes:
+    """
+    Get the signing secret as bytes, re-encoding only when it changes.
+    
+    Args:
+        secret: The signing secret string
+        
+    Returns:
+        The secret encoded as UTF-8 bytes
+    """
+    global _signing_key_cache
+    cached_secret, cached_bytes = _signing_key_cache
+    if secret != cached_secret:
+        cached_bytes = secret.encode()
+        _signing_key_cache = (secret, cached_bytes)
+    return cached_bytes
+
+# GCP clients built once per process: channel setup and auth token
+# exchange cost hundreds of milliseconds, and both clients are
+# thread-safe, so warm invocations must not reconstruct them
+_sm_client: Optional[secretmanager.SecretManagerServiceClient] = None
+_gcs_client: Optional[storage.Client] = None
+_gcs_bucket = None
+
+
+def _get_sm() -> secretmanager.SecretManagerServiceClient:
+    """
+    Get the shared Secret Manager client, creating it on first use.
+    
+    Returns:
+        The process-wide SecretManagerServiceClient
+    """
+    global _sm_client
+    if _sm_client is None:
+        _sm_client = secretmanager.SecretManagerServiceClient()
+    return _sm_client
+
+
+def _get_gcs_bucket():
+    """
+    Get the shared handle for the configured GCS bucket.
+    
+    Returns:
+        The process-wide Bucket for GCS_BUCKET_NAME
+    """
+    global _gcs_client, _gcs_bucket
+    if _gcs_bucket is None:
+        _gcs_client = storage.Client()
+        _gcs_bucket = _gcs_client.bucket(GCS_BUCKET_NAME)
+    return _gcs_bucket
+
+# Shared pool for blocking I/O that can overlap request processing.
+# Module-level so warm invocations reuse the threads instead of paying
+# pool startup per request.
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Plugin manager reused across warm invocations; Cloud Functions keep the
+# process alive between requests, so the directory walk and module loads
+# only need to happen when the plugin registry actually changes
+_plugin_manager: Optional[PluginManager] = None
+_plugin_registry_mtime: Optional[int] = None
+
+
+def _registry_mtime(manager: PluginManager) -> Optional[int]:
+    """
+    Get the registry file's mtime, or None if it doesn't exist.
+    
+    Args:
+        manager: The plugin manager whose registry path to check
+        
+    Returns:
+        st_mtime_ns of registry.json, or None
+    """
+    try:
+        return os.stat(manager.registry_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _get_plugin_manager() -> PluginManager:
+    """
+    Get the shared plugin manager, discovering plugins only when needed.
+    
+    The first call on a cold instance runs full discovery; later calls
+    reuse the loaded plugin set and only re-discover when registry.json's
+    mtime changes.
+    
+    Returns:
+        The process-wide PluginManager
+    """
+    global _plugin_manager, _plugin_registry_mtime
+    
+    manager = _plugin_manager
+    if manager is None:
+        manager = PluginManager()
+        manager.discover_plugins()
+        _plugin_manager = manager
+        _plugin_registry_mtime = _registry_mtime(manager)
+        return manager
+    
+    mtime = _registry_mtime(manager)
+    if mtime != _plugin_registry_mtime:
+        manager.discover_plugins()
+        _plugin_registry_mtime = mtime
+    return manager
 
 # Block Kit UI Builder Functions
 def create_header(text: str) -> Dict[str, Any]:
@@ -127,6 +308,20 @@ def create_button(text: str, action_id: str, value: str, style: str = "primary")
         "style": style
     }
 
+# Static blocks shared by every wellness message. These are pure data
+# and nothing downstream mutates them, so building them once at import
+# saves ~10 dict allocations per response.
+_DIVIDER_BLOCK = create_divider()
+_HEADER_CHECKIN = create_header("LifeGoal Wellness Check-in")
+_ACTIONS_BLOCK = {
+    "type": "actions",
+    "elements": [
+        create_button("Check In", "checkin_action", "checkin", "primary"),
+        create_button("View Goals", "goals_action", "goals", "default"),
+        create_button("Get Summary", "summary_action", "summary", "default")
+    ]
+}
+
 def create_wellness_message(response_text: str, 
                           plugin_messages: List[str] = None,
                           user_data: Dict[str, Any] = None,
@@ -146,14 +341,14 @@ def create_wellness_message(response_text: str,
     blocks = []
     
     # Add header
-    blocks.append(create_header("LifeGoal Wellness Check-in"))
+    blocks.append(_HEADER_CHECKIN)
     
     # Add main response section
     blocks.append(create_section(response_text))
     
     # Add plugin messages if available
     if plugin_messages and len(plugin_messages) > 0:
-        blocks.append(create_divider())
+        blocks.append(_DIVIDER_BLOCK)
         blocks.append(create_section("*Personalized Insights:*"))
         
         for message in plugin_messages:
@@ -161,7 +356,7 @@ def create_wellness_message(response_text: str,
     
     # Add user data summary if available
     if user_data:
-        blocks.append(create_divider())
+        blocks.append(_DIVIDER_BLOCK)
         
         # Format user data into a readable summary
         mood = user_data.get("mood", "Not specified")
@@ -173,18 +368,8 @@ def create_wellness_message(response_text: str,
     
     # Add action buttons if enabled
     if actions_available:
-        blocks.append(create_divider())
-        
-        actions = {
-            "type": "actions",
-            "elements": [
-                create_button("Check In", "checkin_action", "checkin", "primary"),
-                create_button("View Goals", "goals_action", "goals", "default"),
-                create_button("Get Summary", "summary_action", "summary", "default")
-            ]
-        }
-        
-        blocks.append(actions)
+        blocks.append(_DIVIDER_BLOCK)
+        blocks.append(_ACTIONS_BLOCK)
     
     return blocks
 
@@ -199,17 +384,18 @@ def get_secret(secret_name: str) -> str:
     Returns:
         The secret value as a string
     """
-    if secret_name in _secret_cache:
-        return _secret_cache[secret_name]
+    cached = _secret_cache.get(secret_name)
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
     
     try:
-        client = secretmanager.SecretManagerServiceClient()
+        client = _get_sm()
         name = f"projects/{PROJECT_ID}/secrets/{secret_name}/versions/latest"
         response = client.access_secret_version(request={"name": name})
         secret_value = response.payload.data.decode("UTF-8")
         
         # Cache the secret for future use
-        _secret_cache[secret_name] = secret_value
+        _secret_cache[secret_name] = (secret_value, time.monotonic() + _SECRET_TTL)
         
         return secret_value
     except Exception as e:
@@ -218,6 +404,14 @@ def get_secret(secret_name: str) -> str:
         return os.environ.get(secret_name.upper(), "")
 
 
+# Warm the signing secret during cold start: the Secret Manager round
+# trip overlaps module import, so the first request's signature check
+# usually finds the cache already populated. Gated on PROJECT_ID so
+# local runs without GCP credentials stay quiet.
+if PROJECT_ID:
+    _IO_POOL.submit(get_secret, "slack_signing_secret")
+
+
 def verify_slack_request(request) -> bool:
     """
     Verify that the request is coming from Slack.
@@ -247,21 +441,47 @@ def verify_slack_request(request) -> bool:
         # The request is older than 5 minutes
         return False
     
-    # Create signature base string
-    request_body = request.data.decode("utf-8")
-    sig_basestring = f"v0:{slack_timestamp}:{request_body}"
-    
-    # Generate a signature using the signing secret
-    my_signature = "v0=" + hmac.new(
-        slack_signing_secret.encode(),
-        sig_basestring.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    # Create the signature base string directly in bytes. Slack signs
+    # the raw request body, so decoding to str and re-encoding for the
+    # MAC copies the payload twice for nothing — concatenating bytes
+    # feeds the original buffer straight into the digest.
+    sig_basestring = (
+        b"v0:" + slack_timestamp.encode("ascii") + b":" + request.data
+    )
+    
+    # Generate a signature using the signing secret. hmac.digest is the
+    # one-shot fast path: it stays in C for the whole computation instead
+    # of building an HMAC object and updating it incrementally.
+    my_signature = "v0=" + hmac.digest(
+        _signing_key(slack_signing_secret),
+        sig_basestring,
+        "sha256",
+    ).hex()
     
     # Compare signatures
     return hmac.compare_digest(my_signature, slack_signature)
 
 
+# Any blob at least this large is fetched with parallel byte-range
+# requests instead of one streamed GET
+_CHUNKED_DOWNLOAD_THRESHOLD = 8 * 1024 * 1024
+
+
+def _make_scratch_dir() -> str:
+    """
+    Create a scratch directory for the database, preferring tmpfs.
+    
+    /dev/shm is RAM-backed where available, so SQLite page I/O never
+    touches disk; falls back to the default temp directory otherwise.
+    
+    Returns:
+        Path to a fresh scratch directory
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return tempfile.mkdtemp(dir="/dev/shm")
+    return tempfile.mkdtemp()
+
+
 def download_db_from_gcs() -> str:
     """
     Download the SQLite database from Google Cloud Storage.
@@ -270,15 +490,32 @@ def download_db_from_gcs() -> str:
         Local path to the downloaded database file
     """
     # Create a temporary file to store the database
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = _make_scratch_dir()
     db_path = os.path.join(temp_dir, DB_NAME)
     
     try:
         # Download from GCS
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(DB_NAME)
-        blob.download_to_filename(db_path)
+        blob = _get_gcs_bucket().blob(DB_NAME)
+        
+        # Large databases download noticeably faster over several
+        # concurrent range requests than one streamed GET; small ones
+        # aren't worth the extra round trips. Blobs stored with a
+        # Content-Encoding (the DB uploads gzip-compressed) must take the
+        # streamed path: ranged GETs don't compose with decompressive
+        # transcoding, so chunked assembly would yield raw gzip bytes.
+        blob.reload()
+        try:
+            from google.cloud.storage import transfer_manager
+        except ImportError:
+            transfer_manager = None
+        if (transfer_manager is not None
+                and blob.content_encoding is None and blob.size
+                and blob.size >= _CHUNKED_DOWNLOAD_THRESHOLD):
+            transfer_manager.download_chunks_concurrently(
+                blob, db_path, max_workers=4
+            )
+        else:
+            blob.download_to_filename(db_path)
         print(f"Downloaded database from gs://{GCS_BUCKET_NAME}/{DB_NAME}")
     except Exception as e:
         print(f"Error downloading database: {e}")
@@ -290,29 +527,6 @@ def download_db_from_gcs() -> str:
     return db_path
 
 
-def upload_db_to_gcs(db_path: str) -> bool:
-    """
-    Upload the SQLite database to Google Cloud Storage.
-    
-    Args:
-        db_path: Local path to the database file
-        
-    Returns:
-        True if upload was successful, False otherwise
-    """
-    try:
-        # Upload to GCS
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(DB_NAME)
-        blob.upload_from_filename(db_path)
-        print(f"Uploaded database to gs://{GCS_BUCKET_NAME}/{DB_NAME}")
-        return True
-    except Exception as e:
-        print(f"Error uploading database: {e}")
-        return False
-
-
 def extract_user_info(event_data: Dict[str, Any]) -> Tuple[str, str, str]:
     """
     Extract user ID, channel ID, and event timestamp from the event data.
@@ -379,7 +593,8 @@ def process_message(raw_text: str) -> Dict[str, Any]:
 
 def generate_response(user_id: str, 
                      structured_data: Dict[str, Any], 
-                     db_manager: DatabaseManager) -> str:
+                     db_manager: DatabaseManager,
+                     recent_data: List[Dict[str, Any]]) -> str:
     """
     Generate a response to the user based on structured data.
     
@@ -387,23 +602,19 @@ def generate_response(user_id: str,
         user_id: The user's Slack ID
         structured_data: Dictionary containing structured data from the message
         db_manager: The database manager instance
+        recent_data: Parsed data from the user's recent check-ins,
+                     fetched once by the caller
         
     Returns:
         Response text to send to the user
     """
-    # Get recent check-ins and active persona
-    recent_checkins = db_manager.get_recent_checkins(user_id)
+    # Get the active persona
     persona = db_manager.get_active_persona()
     
     # Initialize the LLM registry and select a model for chat
     llm_registry = LLMRegistry()
     model = llm_registry.select_model("chat")
     
-    # Format recent check-in data for the prompt
-    recent_data = []
-    for checkin in recent_checkins:
-        recent_data.append(checkin.parsed_data)
-    
     # Create a prompt for generating a response
     prompt = f"""
     You are a wellness assistant named LifeGoal. Your persona: {persona.name if persona else 'Friendly Wellness Guide'}
@@ -413,10 +624,10 @@ def generate_response(user_id: str,
     User behavioral summary: {persona.user_behavior_summary if persona and persona.user_behavior_summary else ''}
     
     Current user data:
-    {json.dumps(structured_data, indent=2)}
+    {_dumps_pretty(structured_data)}
     
     Recent interactions:
-    {json.dumps(recent_data, indent=2)}
+    {_recent_data_json(user_id, recent_data)}
     
     Generate a friendly, helpful response to the user based on their current data and history.
     Keep your response concise (1-2 paragraphs) and conversational.
@@ -433,31 +644,25 @@ def generate_response(user_id: str,
 
 def process_plugin_recommendations(user_id: str, 
                                   structured_data: Dict[str, Any], 
-                                  db_manager: DatabaseManager) -> Dict[str, Any]:
+                                  recent_data: List[Dict[str, Any]],
+                                  user_goals: List[Goal]) -> Dict[str, Any]:
     """
     Process plugins that match the current context.
     
     Args:
         user_id: The user's Slack ID
         structured_data: Dictionary containing structured data from the message
-        db_manager: The database manager instance
+        recent_data: Parsed data from the user's recent check-ins,
+                     fetched once by the caller
+        user_goals: The user's goals, fetched once by the caller
         
     Returns:
         Dictionary containing plugin results
     """
-    # Load plugins
-    plugin_manager = PluginManager()
-    plugins = plugin_manager.discover_plugins()
-    
-    # Get user data
-    recent_checkins = db_manager.get_recent_checkins(user_id)
-    user_goals = db_manager.get_user_goals(user_id)
-    
-    # Format check-ins and goals for the user context
-    recent_data = []
-    for checkin in recent_checkins:
-        recent_data.append(checkin.parsed_data)
+    # Reuse the warm-instance plugin manager
+    plugin_manager = _get_plugin_manager()
     
+    # Format goals for the user context
     goals_data = []
     for goal in user_goals:
         goals_data.append({
@@ -478,18 +683,18 @@ def process_plugin_recommendations(user_id: str,
     # Find matching plugins
     matching_plugins = plugin_manager.match_plugins_to_context(user_context)
     
-    # Execute matching plugins
+    # Execute matching plugins through a prebuilt dispatch table
     plugin_results = {}
     llm_registry = LLMRegistry()
-    
-    for plugin in matching_plugins:
+    dispatch = AssistantPlugin.build_dispatch(matching_plugins)
+
+    for plugin_id, execute in dispatch.items():
         try:
-            plugin_id = plugin.plugin_id
-            plugin_results[plugin_id] = plugin.execute(user_context, llm_registry)
+            plugin_results[plugin_id] = execute(user_context, llm_registry)
         except Exception as e:
-            print(f"Error executing plugin {plugin.plugin_id}: {e}")
-            plugin_results[plugin.plugin_id] = {"error": str(e)}
-    
+            print(f"Error executing plugin {plugin_id}: {e}")
+            plugin_results[plugin_id] = {"error": str(e)}
+
     return plugin_results
 
 
@@ -506,21 +711,26 @@ def handle_slack_event(request) -> Dict[str, Any]:
     if not verify_slack_request(request):
         return {"statusCode": 403, "body": "Invalid request signature"}
     
-    # Parse the event data
+    # Parse the event data straight from the bytes body — decoding to
+    # str first just copies the payload the parser is about to re-read
     try:
-        request_body = request.data.decode("utf-8")
+        request_body = request.data
         
         # Check if it's a URL-encoded form (interactive components)
         if request.headers.get("Content-Type") == "application/x-www-form-urlencoded":
-            import urllib.parse
-            payload = urllib.parse.parse_qs(request_body).get("payload", ["{}"])[0]
-            event_data = json.loads(payload)
+            from urllib.parse import parse_qsl
+            payload = b"{}"
+            for key, value in parse_qsl(request_body):
+                if key == b"payload":
+                    payload = value
+                    break
+            event_data = _loads(payload)
             
             # Handle interactive components (buttons, etc.)
             return handle_interactive_component(event_data)
         else:
             # Regular event API
-            event_data = json.loads(request_body)
+            event_data = _loads(request_body)
     except json.JSONDecodeError:
         return {"statusCode": 400, "body": "Invalid JSON"}
     
@@ -528,56 +738,76 @@ def handle_slack_event(request) -> Dict[str, Any]:
     if event_data.get("type") == "url_verification":
         return {"statusCode": 200, "body": event_data.get("challenge", "")}
     
-    # Initialize database manager
-    db_path = download_db_from_gcs()
+    # Only user messages touch the database; answer everything else
+    # (reaction_added, app_mention retries, bot echoes) before paying
+    # for the GCS download at all
+    event = event_data.get("event", {})
+    event_type = event.get("type", "")
+    if event_type != "message" or event.get("bot_id"):
+        return {"statusCode": 200, "body": "Event received"}
+    
+    # Kick off the GCS database download now that the event is known to
+    # need it. process_message below is an LLM round-trip that doesn't
+    # touch the database, so the two network waits overlap.
+    db_future = _IO_POOL.submit(download_db_from_gcs)
+    
+    user_id, channel_id, event_ts = extract_user_info(event_data)
+    text = event.get("text", "")
+    
+    # Process message to extract structured data
+    structured_data = process_message(text)
+    
+    # Initialize database manager once the overlapped download lands
+    db_path = db_future.result()
     db_manager = DatabaseManager(GCS_BUCKET_NAME, DB_NAME, db_path)
     
-    # Use the database lock context manager
-    with DatabaseLock(db_manager):
-        # Extract event info
-        event = event_data.get("event", {})
-        event_type = event.get("type", "")
-        
-        # Handle message events
-        if event_type == "message" and not event.get("bot_id"):
-            user_id, channel_id, event_ts = extract_user_info(event_data)
-            text = event.get("text", "")
-            
-            # Process message to extract structured data
-            structured_data = process_message(text)
-            
-            # Store check-in
-            db_manager.store_checkin(user_id, text, structured_data)
-            
-            # Generate response
-            response = generate_response(user_id, structured_data, db_manager)
-            
-            # Process plugins
-            plugin_results = process_plugin_recommendations(user_id, structured_data, db_manager)
-            
-            # Enhance response with plugin recommendations if relevant
-            plugin_messages = []
-            if plugin_results:
-                for plugin_id, result in plugin_results.items():
-                    if "message" in result:
-                        plugin_messages.append(result["message"])
-            
-            # Create rich Slack message
-            blocks = create_wellness_message(response, plugin_messages, structured_data)
-            
-            # Send response to Slack (in a real implementation, use Slack's API)
-            # Here we're just returning the response for demonstration
-            return {
-                "statusCode": 200,
-                "body": {
-                    "response_type": "in_channel",
-                    "blocks": blocks,
-                    "channel": channel_id,
-                }
-            }
-    
-    # Default response for other events
-    return {"statusCode": 200, "body": "Event received"}
+    # Store check-in. store_checkin serializes same-user writers through
+    # its own per-user shard lock and uploads the database itself, so no
+    # outer lock is held here; the reads below work against the local
+    # snapshot.
+    db_manager.store_checkin(user_id, text, structured_data)
+
+    # Fetch the user's history once; the response and the plugin
+    # pass both read exactly these rows, so fetching in each callee
+    # doubled the SQL round-trips and the parsed_data loops
+    recent_checkins = db_manager.get_recent_checkins(user_id)
+    user_goals = db_manager.get_user_goals(user_id)
+    recent_data = [checkin.parsed_data for checkin in recent_checkins]
+
+    # The chat response and the plugin pass are independent given
+    # structured_data, and each can spend a second or more waiting
+    # on an LLM. Run the response on the shared pool while plugins
+    # execute on this thread so the two waits overlap; both read
+    # only the pre-fetched history above, and the persona lookup in
+    # generate_response is served from the manager's read cache.
+    response_future = _IO_POOL.submit(
+        generate_response, user_id, structured_data, db_manager, recent_data
+    )
+    plugin_results = process_plugin_recommendations(
+        user_id, structured_data, recent_data, user_goals
+    )
+    response = response_future.result()
+
+    # Enhance response with plugin recommendations if relevant
+    plugin_messages = []
+    if plugin_results:
+        for plugin_id, result in plugin_results.items():
+            if "message" in result:
+                plugin_messages.append(result["message"])
+
+    # Create rich Slack message
+    blocks = create_wellness_message(response, plugin_messages, structured_data)
+
+    # Send response to Slack (in a real implementation, use Slack's API)
+    # Here we're just returning the response for demonstration
+    return {
+        "statusCode": 200,
+        "body": {
+            "response_type": "in_channel",
+            "blocks": blocks,
+            "channel": channel_id,
+        }
+    }
 
 
 def slack_webhook(request):
@@ -6,8 +6,11 @@ It analyzes check-ins, identifies patterns, and provides insights to help the us
 improve their wellbeing.
 """
 import os
+import hashlib
 import json
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
@@ -18,9 +21,23 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from google.cloud import secretmanager
 from google.cloud import storage
 
-from core.db_manager import DatabaseManager, DatabaseLock
+from core.db_manager import DatabaseManager
 from core.llm_registry import LLMRegistry
-from core.models import User, CheckIn, Goal, Summary
+from core.models import CheckIn, Goal, Summary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson parses LLM output several times faster than the stdlib and
+# accepts the response bytes or str directly
+_loads = orjson.loads if orjson is not None else json.loads
 
 
 # Configuration
@@ -28,8 +45,170 @@ PROJECT_ID = os.environ.get("PROJECT_ID", "")
 GCS_BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME", "lifegoal-data")
 DB_NAME = os.environ.get("DB_NAME", "lifegoal.db")
 
-# Secret cache to avoid repeated Secret Manager calls
+# Shared pool for blocking I/O that can overlap other work;
+# module-level so warm invocations reuse the threads
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Summary model cached across invocations: registry construction and
+# provider-client setup only need to happen once per process
+_summary_model = None
+
+
+def _get_summary_model():
+    """
+    Get the shared summary model, creating it on first use.
+    
+    Returns:
+        The process-wide model selected for summary generation
+    """
+    global _summary_model
+    if _summary_model is None:
+        _summary_model = LLMRegistry().select_model("summary")
+    return _summary_model
+
+
+# Pre-warm the model during cold start when running on Cloud
+# Functions/Cloud Run (K_SERVICE is set there): the construction
+# overlaps the rest of module import instead of landing on the first
+# request. Local imports skip it so tests stay side-effect free.
+if os.environ.get("K_SERVICE"):
+    _IO_POOL.submit(_get_summary_model)
+
+
+# Secret cache to avoid repeated Secret Manager calls; values are
+# (secret, expiry) pairs on a monotonic clock so rotated secrets are
+# picked up within _SECRET_TTL seconds instead of never
 _secret_cache = {}
+_SECRET_TTL = 3600
+
+# Secret Manager client built once per process; channel setup and
+# credential exchange are far too expensive to repeat per lookup
+_sm_client: Optional[secretmanager.SecretManagerServiceClient] = None
+
+
+def _get_sm() -> secretmanager.SecretManagerServiceClient:
+    """
+    Get the shared Secret Manager client, creating it on first use.
+    
+    Returns:
+        The process-wide SecretManagerServiceClient
+    """
+    global _sm_client
+    if _sm_client is None:
+        _sm_client = secretmanager.SecretManagerServiceClient()
+    return _sm_client
+
+# Bump when the summary prompt or output schema changes so older cached
+# summaries stop matching
+_SUMMARY_PROMPT_VERSION = "1"
+
+# GCS prefix for the content-addressed summary cache
+_SUMMARY_CACHE_PREFIX = "summary_cache/"
+
+# Storage client and bucket handle built once per process
+_gcs_client: Optional[storage.Client] = None
+_gcs_bucket = None
+
+
+def _get_gcs_bucket():
+    """
+    Get the shared handle for the configured GCS bucket.
+    
+    Returns:
+        The process-wide Bucket for GCS_BUCKET_NAME
+    """
+    global _gcs_client, _gcs_bucket
+    if _gcs_bucket is None:
+        _gcs_client = storage.Client()
+        _gcs_bucket = _gcs_client.bucket(GCS_BUCKET_NAME)
+    return _gcs_bucket
+
+
+def _summary_cache_key(model_id: str, user_data: Dict[str, Any],
+                       patterns: Dict[str, Any]) -> str:
+    """
+    Compute the content hash identifying one summary generation.
+    
+    Canonicalizes each input section to sorted compact JSON and
+    length-prefixes it before hashing, so section boundaries can't
+    collide and identical inputs always map to the same key.
+    
+    Args:
+        model_id: Identifier of the model that would generate the summary
+        user_data: Dictionary containing user data
+        patterns: Dictionary containing patterns
+        
+    Returns:
+        Hex SHA-256 digest of the canonicalized inputs
+    """
+    digest = hashlib.sha256()
+    for section in (
+        model_id,
+        _SUMMARY_PROMPT_VERSION,
+        json.dumps(user_data, sort_keys=True, separators=(",", ":"), default=str),
+        json.dumps(patterns, sort_keys=True, separators=(",", ":"), default=str),
+    ):
+        raw = section.encode()
+        digest.update(len(raw).to_bytes(8, "big"))
+        digest.update(raw)
+    return digest.hexdigest()
+
+
+def _load_cached_summary(cache_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a previously generated summary by content hash.
+    
+    Args:
+        cache_key: Hex digest from _summary_cache_key
+        
+    Returns:
+        The cached summary dict, or None on miss
+    """
+    try:
+        blob = _get_gcs_bucket().blob(f"{_SUMMARY_CACHE_PREFIX}{cache_key}.json")
+        entry = json.loads(blob.download_as_bytes())
+        summary = entry.get("summary")
+        if isinstance(summary, dict) and "overview" in summary:
+            return summary
+    except Exception:
+        # Cache misses and transient GCS errors both just mean "generate"
+        pass
+    return None
+
+
+def _store_cached_summary(cache_key: str, model_id: str,
+                          summary: Dict[str, Any]) -> None:
+    """
+    Store a generated summary under its content hash.
+    
+    Args:
+        cache_key: Hex digest from _summary_cache_key
+        model_id: Identifier of the model that generated the summary
+        summary: The generated summary dict
+    """
+    entry = {
+        "model": model_id,
+        "prompt_version": _SUMMARY_PROMPT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "summary": summary,
+    }
+    def _upload():
+        try:
+            blob = _get_gcs_bucket().blob(f"{_SUMMARY_CACHE_PREFIX}{cache_key}.json")
+            # if_generation_match=0 makes concurrent writers race
+            # safely: whoever lands first wins and the loser's
+            # identical entry is simply dropped
+            blob.upload_from_string(
+                json.dumps(entry), content_type="application/json",
+                if_generation_match=0,
+            )
+        except Exception as e:
+            print(f"Error writing summary cache entry: {e}")
+    
+    # Fire-and-forget: the caller never reads this entry back in the
+    # same invocation, so its round trip shouldn't extend the request.
+    # The pool is joined at process shutdown, not per call.
+    _IO_POOL.submit(_upload)
 
 
 def get_secret(secret_name: str) -> str:
@@ -42,17 +221,18 @@ def get_secret(secret_name: str) -> str:
     Returns:
         The secret value as a string
     """
-    if secret_name in _secret_cache:
-        return _secret_cache[secret_name]
+    cached = _secret_cache.get(secret_name)
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
     
     try:
-        client = secretmanager.SecretManagerServiceClient()
+        client = _get_sm()
         name = f"projects/{PROJECT_ID}/secrets/{secret_name}/versions/latest"
         response = client.access_secret_version(request={"name": name})
         secret_value = response.payload.data.decode("UTF-8")
         
         # Cache the secret for future use
-        _secret_cache[secret_name] = secret_value
+        _secret_cache[secret_name] = (secret_value, time.monotonic() + _SECRET_TTL)
         
         return secret_value
     except Exception as e:
@@ -61,57 +241,69 @@ def get_secret(secret_name: str) -> str:
         return os.environ.get(secret_name.upper(), "")
 
 
+def _scratch_db_path() -> str:
+    """
+    Get the stable local path for the database copy, preferring tmpfs.
+    
+    A fixed path (instead of a fresh mkdtemp per call) is what lets the
+    generation cache reuse the file across warm invocations; /dev/shm
+    keeps SQLite page I/O in RAM where it exists and is writable.
+    
+    Returns:
+        Path for the local database file
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", DB_NAME)
+    return os.path.join(tempfile.gettempdir(), DB_NAME)
+
+
+# Local database copy surviving warm invocations, keyed by the GCS
+# object generation so an unchanged remote database costs one metadata
+# RPC instead of a full re-download
+_DB_CACHE = {"generation": None, "path": None}
+
+
 def download_db_from_gcs() -> str:
     """
     Download the SQLite database from Google Cloud Storage.
     
+    On warm instances the previous copy is revalidated against the
+    blob's generation first and reused when the remote object hasn't
+    changed.
+    
     Returns:
         Local path to the downloaded database file
     """
-    # Create a temporary file to store the database
-    temp_dir = tempfile.mkdtemp()
-    db_path = os.path.join(temp_dir, DB_NAME)
+    db_path = _scratch_db_path()
     
     try:
-        # Download from GCS
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(DB_NAME)
+        # One metadata RPC decides whether any bytes need to move
+        blob = _get_gcs_bucket().get_blob(DB_NAME)
+        if blob is None:
+            raise FileNotFoundError(f"gs://{GCS_BUCKET_NAME}/{DB_NAME}")
+        
+        cached_path = _DB_CACHE["path"]
+        if (cached_path
+                and _DB_CACHE["generation"] == blob.generation
+                and os.path.exists(cached_path)):
+            return cached_path
+        
         blob.download_to_filename(db_path)
         print(f"Downloaded database from gs://{GCS_BUCKET_NAME}/{DB_NAME}")
+        _DB_CACHE["generation"] = blob.generation
+        _DB_CACHE["path"] = db_path
     except Exception as e:
         print(f"Error downloading database: {e}")
         # If download fails, create a new database
         print("Creating new database")
         from core.models import initialize_db
         initialize_db(db_path)
+        _DB_CACHE["generation"] = None
+        _DB_CACHE["path"] = db_path
     
     return db_path
 
 
-def upload_db_to_gcs(db_path: str) -> bool:
-    """
-    Upload the SQLite database to Google Cloud Storage.
-    
-    Args:
-        db_path: Local path to the database file
-        
-    Returns:
-        True if upload was successful, False otherwise
-    """
-    try:
-        # Upload to GCS
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(DB_NAME)
-        blob.upload_from_filename(db_path)
-        print(f"Uploaded database to gs://{GCS_BUCKET_NAME}/{DB_NAME}")
-        return True
-    except Exception as e:
-        print(f"Error uploading database: {e}")
-        return False
-
-
 def get_user_data(db_manager: DatabaseManager, 
                  user_id: str, 
                  days: int = 7) -> Dict[str, Any]:
@@ -131,42 +323,51 @@ def get_user_data(db_manager: DatabaseManager,
         # Calculate the start date for filtering
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get the user
-        user = session.query(User).filter(User.id == user_id).first()
-        if not user:
-            return {"checkins": [], "goals": []}
+        # No separate User existence probe: both queries filter on
+        # user_id, so an unknown user falls out as two empty lists —
+        # the same result the probe produced, one query cheaper
         
-        # Get check-ins
-        checkins_query = session.query(CheckIn) \
+        # Project just the columns the summary reads: Row tuples skip
+        # the per-attribute descriptor fires and identity-map
+        # bookkeeping of full ORM instances, and yield_per bounds
+        # memory on long 30-day windows
+        checkins_query = session.query(
+                CheckIn.id, CheckIn.timestamp,
+                CheckIn.raw_input, CheckIn.structured_data) \
             .filter(CheckIn.user_id == user_id) \
             .filter(CheckIn.timestamp >= start_date) \
-            .order_by(CheckIn.timestamp.asc())
+            .order_by(CheckIn.timestamp.asc()) \
+            .yield_per(500)
             
         checkins = []
-        for checkin in checkins_query:
+        for checkin_id, timestamp, raw_input, structured_data in checkins_query:
             checkins.append({
-                "id": checkin.id,
-                "timestamp": checkin.timestamp.isoformat(),
-                "raw_input": checkin.raw_input,
-                "structured_data": checkin.parsed_data
+                "id": checkin_id,
+                "timestamp": timestamp.isoformat(),
+                "raw_input": raw_input,
+                "structured_data": structured_data or {}
             })
         
         # Get goals
-        goals_query = session.query(Goal).filter(Goal.user_id == user_id)
+        goals_query = session.query(
+                Goal.id, Goal.name, Goal.description,
+                Goal.created_at, Goal.achieved_at) \
+            .filter(Goal.user_id == user_id)
         
         goals = []
-        for goal in goals_query:
+        for goal_id, name, description, created_at, achieved_at in goals_query:
             goals.append({
-                "id": goal.id,
-                "name": goal.name,
-                "description": goal.description,
-                "created_at": goal.created_at.isoformat(),
-                "achieved_at": goal.achieved_at.isoformat() if goal.achieved_at else None
+                "id": goal_id,
+                "name": name,
+                "description": description,
+                "created_at": created_at.isoformat(),
+                "achieved_at": achieved_at.isoformat() if achieved_at else None
             })
         
         return {"checkins": checkins, "goals": goals}
     
-    return db_manager.with_session(_query)
+    # Pure read: skip the lock and the re-upload entirely
+    return db_manager.with_session(_query, read_only=True)
 
 
 def extract_patterns(user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -181,52 +382,36 @@ def extract_patterns(user_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     checkins = user_data.get("checkins", [])
     
-    # Extract moods
+    # One pass over the check-ins: each structured_data dict is fetched
+    # and probed once per field instead of re-walking the whole list for
+    # every category
     moods = []
-    for checkin in checkins:
-        structured_data = checkin.get("structured_data", {})
-        mood = structured_data.get("mood")
-        if mood:
-            moods.append({
-                "timestamp": checkin.get("timestamp"),
-                "mood": mood
-            })
-    
-    # Extract sleep quality
     sleep_data = []
+    energy_data = []
+    concerns = []
+    needs = []
+    
     for checkin in checkins:
-        structured_data = checkin.get("structured_data", {})
-        sleep_quality = structured_data.get("sleep_quality")
-        if sleep_quality:
+        structured_data = checkin.get("structured_data") or {}
+        timestamp = checkin.get("timestamp")
+        
+        if mood := structured_data.get("mood"):
+            moods.append({"timestamp": timestamp, "mood": mood})
+        
+        if sleep_quality := structured_data.get("sleep_quality"):
             sleep_data.append({
-                "timestamp": checkin.get("timestamp"),
+                "timestamp": timestamp,
                 "sleep_quality": sleep_quality
             })
-    
-    # Extract energy levels
-    energy_data = []
-    for checkin in checkins:
-        structured_data = checkin.get("structured_data", {})
-        energy_level = structured_data.get("energy_level")
-        if energy_level:
+        
+        if energy_level := structured_data.get("energy_level"):
             energy_data.append({
-                "timestamp": checkin.get("timestamp"),
+                "timestamp": timestamp,
                 "energy_level": energy_level
             })
-    
-    # Extract concerns and needs
-    concerns = []
-    needs = []
-    for checkin in checkins:
-        structured_data = checkin.get("structured_data", {})
-        
-        if "concerns" in structured_data:
-            for concern in structured_data["concerns"]:
-                concerns.append(concern)
         
-        if "needs" in structured_data:
-            for need in structured_data["needs"]:
-                needs.append(need)
+        concerns.extend(structured_data.get("concerns", ()))
+        needs.extend(structured_data.get("needs", ()))
     
     return {
         "moods": moods,
@@ -237,6 +422,140 @@ def extract_patterns(user_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# Required summary fields and their expected types, declared once at
+# module scope so every generation validates against the same table
+_SUMMARY_SCHEMA = (
+    ("overview", str),
+    ("patterns", list),
+    ("insights", list),
+    ("suggestions", list),
+    ("encouragement", str),
+)
+
+
+def _validate_summary(summary: Any) -> Optional[str]:
+    """
+    Check a parsed LLM response against the summary schema.
+    
+    Args:
+        summary: The parsed response
+        
+    Returns:
+        A human-readable error string, or None when the summary is valid
+    """
+    if not isinstance(summary, dict):
+        return "response is not a JSON object"
+    for field, expected in _SUMMARY_SCHEMA:
+        if not isinstance(summary.get(field), expected):
+            return f"field '{field}' must be a {expected.__name__}"
+    return None
+
+
+def _compact(obj: Any) -> str:
+    """
+    Serialize obj to compact JSON for LLM prompts.
+    
+    Args:
+        obj: The object to serialize
+        
+    Returns:
+        JSON with no whitespace padding
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+# Ordinal scales for the categorical wellness levels; unknown values
+# are excluded from the numeric reductions
+_MOOD_LEVELS = {
+    "terrible": 0.0, "awful": 0.0, "bad": 1.0, "sad": 1.0, "stressed": 1.0,
+    "anxious": 1.0, "tired": 1.5, "okay": 2.0, "neutral": 2.0, "fine": 2.0,
+    "good": 3.0, "happy": 3.0, "calm": 3.0, "great": 4.0, "excellent": 4.0,
+}
+_SLEEP_LEVELS = {"poor": 0.0, "average": 1.0, "good": 2.0}
+_ENERGY_LEVELS = {"low": 0.0, "medium": 1.0, "high": 2.0}
+
+
+def _series_stats(entries: List[Dict[str, Any]], value_key: str,
+                  levels: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Reduce one categorical time series to mean, per-day trend, and count.
+    
+    Args:
+        entries: List of {"timestamp": ..., value_key: ...} dicts
+        value_key: The field holding the categorical value
+        levels: Mapping from category to its ordinal level
+        
+    Returns:
+        {"mean": ..., "trend": ..., "n": ...}, or {"n": 0} when no
+        entry maps onto the scale
+    """
+    values = []
+    days = []
+    for entry in entries:
+        level = levels.get(str(entry.get(value_key, "")).strip().lower())
+        if level is None:
+            continue
+        try:
+            day = datetime.fromisoformat(entry["timestamp"]).timestamp() / 86400.0
+        except (KeyError, TypeError, ValueError):
+            day = float(len(days))
+        values.append(level)
+        days.append(day)
+    
+    n = len(values)
+    if n == 0:
+        return {"n": 0}
+    
+    if np is not None:
+        value_arr = np.asarray(values)
+        day_arr = np.asarray(days)
+        mean = float(value_arr.mean())
+        if n > 1 and np.ptp(day_arr) > 0:
+            trend = float(np.polyfit(day_arr - day_arr[0], value_arr, 1)[0])
+        else:
+            trend = 0.0
+    else:
+        mean = sum(values) / n
+        day_mean = sum(days) / n
+        var = sum((d - day_mean) ** 2 for d in days)
+        if n > 1 and var > 0:
+            cov = sum((d - day_mean) * (v - mean)
+                      for d, v in zip(days, values))
+            trend = cov / var
+        else:
+            trend = 0.0
+    
+    return {"mean": round(mean, 2), "trend": round(trend, 3), "n": n}
+
+
+def summarize_patterns(patterns: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Collapse the extracted pattern series into small numeric summaries.
+    
+    The raw per-check-in lists are O(N) prompt tokens; their mean,
+    trend, and count carry the signal the summary actually uses in a
+    few dozen bytes.
+    
+    Args:
+        patterns: Dictionary containing patterns from extract_patterns
+        
+    Returns:
+        Dictionary with per-series statistics plus the concern and
+        need lists
+    """
+    return {
+        "mood": _series_stats(patterns.get("moods", []), "mood", _MOOD_LEVELS),
+        "sleep": _series_stats(
+            patterns.get("sleep_data", []), "sleep_quality", _SLEEP_LEVELS),
+        "energy": _series_stats(
+            patterns.get("energy_data", []), "energy_level", _ENERGY_LEVELS),
+        "concerns": patterns.get("concerns", []),
+        "needs": patterns.get("needs", []),
+    }
+
+
 def generate_summary(user_data: Dict[str, Any], patterns: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate a summary of user wellness data.
@@ -248,22 +567,45 @@ def generate_summary(user_data: Dict[str, Any], patterns: Dict[str, Any]) -> Dic
     Returns:
         Dictionary containing the summary
     """
-    # Initialize the LLM registry and select a model for summary generation
-    llm_registry = LLMRegistry()
-    model = llm_registry.select_model("summary")
+    # The summary model is warmed and cached at module level
+    model = _get_summary_model()
+    
+    # The LLM call dominates this function's wall time, and retries of
+    # the daily job (or a weekly run overlapping a daily one) see the
+    # exact same inputs. Serve those from the content-addressed cache
+    # instead of paying the model latency again.
+    model_id = getattr(model, "model_id", None) or type(model).__name__
+    cache_key = _summary_cache_key(model_id, user_data, patterns)
+    cached = _load_cached_summary(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Compact the check-ins before embedding: indented JSON with long
+    # verbatim messages inflates billable prompt tokens (and encode
+    # time) without helping the model, so keys are shortened and
+    # raw_input capped at 200 characters
+    checkins_compact = [
+        {
+            "t": checkin.get("timestamp"),
+            "r": (checkin.get("raw_input") or "")[:200],
+            "s": checkin.get("structured_data"),
+        }
+        for checkin in user_data.get("checkins", [])
+    ]
     
     # Create a prompt for generating a summary
     prompt = f"""
     Generate a wellness summary based on the user's check-in data.
     
-    User check-ins:
-    {json.dumps(user_data.get('checkins', []), indent=2)}
+    User check-ins (t=timestamp, r=message, s=structured data):
+    {_compact(checkins_compact)}
     
     User goals:
-    {json.dumps(user_data.get('goals', []), indent=2)}
+    {_compact(user_data.get('goals', []))}
     
-    Observed patterns:
-    {json.dumps(patterns, indent=2)}
+    Pattern statistics (per series: mean on an ordinal scale where
+    higher is better, per-day trend, and n samples):
+    {_compact(summarize_patterns(patterns))}
     
     Your summary should include:
     1. An overview of the user's wellness over the past week
@@ -281,11 +623,32 @@ def generate_summary(user_data: Dict[str, Any], patterns: Dict[str, Any]) -> Dic
     ONLY return valid JSON, nothing else.
     """
     
-    try:
-        summary_text = model.generate(prompt)
-        summary = json.loads(summary_text)
-    except Exception as e:
-        print(f"Error generating summary: {e}")
+    # Generate with up to two feedback retries: an invalid response is
+    # sent back with the concrete validation error instead of being
+    # silently replaced by the canned fallback
+    attempt_prompt = prompt
+    summary = None
+    for attempt in range(3):
+        try:
+            summary_text = model.generate(attempt_prompt)
+            candidate = _loads(summary_text)
+            error = _validate_summary(candidate)
+            if error is None:
+                summary = candidate
+                _store_cached_summary(cache_key, model_id, summary)
+                break
+        except Exception as e:
+            error = str(e)
+        print(f"Summary attempt {attempt + 1} rejected: {error}")
+        if attempt < 2:
+            time.sleep(attempt + 1)
+            attempt_prompt = (
+                prompt
+                + f"\n\nYour previous response was invalid: {error}. "
+                "Return ONLY a valid JSON object with the required fields."
+            )
+    
+    if summary is None:
         summary = {
             "overview": "We couldn't generate a complete summary at this time.",
             "patterns": [],
@@ -297,6 +660,28 @@ def generate_summary(user_data: Dict[str, Any], patterns: Dict[str, Any]) -> Dic
     return summary
 
 
+def _window_content_hash(user_id: str, latest_ts: Any, count: int) -> str:
+    """
+    Hash the summary-relevant shape of a user's check-in window.
+    
+    The latest timestamp plus the row count changes whenever a new
+    check-in lands, so matching hashes mean the LLM would see the same
+    inputs it already summarized.
+    
+    Args:
+        user_id: The user's unique identifier
+        latest_ts: Timestamp of the newest check-in in the window
+        count: Number of check-ins in the window
+        
+    Returns:
+        Hex SHA-256 digest identifying the input window
+    """
+    latest = latest_ts.isoformat() if latest_ts else ""
+    return hashlib.sha256(
+        f"{user_id}|{latest}|{count}".encode()
+    ).hexdigest()
+
+
 def daily_summary(event, context):
     """
     Cloud Function entry point for generating daily summaries.
@@ -313,33 +698,106 @@ def daily_summary(event, context):
     if not user_id:
         return {"error": "Missing user_id parameter"}
     
-    # Download database from GCS
+    # Overlap the GCS download with LLM client warmup: both cost
+    # hundreds of ms on a cold instance and are independent
+    db_future = _IO_POOL.submit(download_db_from_gcs)
+    _IO_POOL.submit(_get_summary_model)
+    db_path = db_future.result()
+    
+    # Initialize database manager
+    db_manager = DatabaseManager(GCS_BUCKET_NAME, DB_NAME, db_path)
+    
+    # The reads below are lock-free (they work against the downloaded
+    # snapshot) and save_summary serializes same-user writers through its
+    # own per-user shard lock, which also handles the upload. No outer
+    # lock is held across the LLM call.
+    # One SQL aggregate decides whether anything changed before a
+    # single check-in row is ferried into Python
+    since = datetime.utcnow() - timedelta(days=7)
+    count, latest_ts = db_manager.get_checkin_window_stats(user_id, since)
+
+    # Skip if there's no check-in data
+    if not count:
+        return {"status": "No check-in data available"}
+
+    # Skip the LLM entirely when no check-in arrived since the
+    # last summary: same inputs would only reproduce it
+    content_hash = _window_content_hash(user_id, latest_ts, count)
+    prior = db_manager.get_latest_summary(user_id)
+    if prior is not None and prior.content_hash == content_hash:
+        return {"status": "Summary unchanged", "summary": prior.parsed_data}
+
+    # Get user data for the past 7 days
+    user_data = get_user_data(db_manager, user_id, days=7)
+
+    # Extract patterns
+    patterns = extract_patterns(user_data)
+
+    # Generate summary
+    summary = generate_summary(user_data, patterns)
+
+    # Save the summary
+    db_manager.save_summary(user_id, summary, content_hash=content_hash)
+
+    return {"status": "Summary generated", "summary": summary}
+
+
+def batch_daily_summary(event, context):
+    """
+    Cloud Function entry point for generating daily summaries in batch.
+    
+    Downloads the database once, reads every user's window serially
+    from the local copy, then fans only the LLM generation out over a
+    thread pool — generate_summary is network-bound, so users overlap
+    almost fully — and writes every summary back in a single
+    transaction and one upload instead of one round trip per user.
+    
+    Args:
+        event: Event payload with a user_ids list
+        context: Event context
+        
+    Returns:
+        Dictionary containing the batch status
+    """
+    user_ids = event.get("user_ids") or []
+    if not user_ids:
+        return {"error": "Missing user_ids parameter"}
+    
+    # Download database from GCS once for the whole batch
     db_path = download_db_from_gcs()
     
     # Initialize database manager
     db_manager = DatabaseManager(GCS_BUCKET_NAME, DB_NAME, db_path)
     
-    # Use the database lock context manager
-    with DatabaseLock(db_manager):
-        # Get user data for the past 7 days
+    # Fetch every user's window serially on this thread: the manager's
+    # StaticPool shares one sqlite3 connection, so concurrent sessions
+    # would interleave transactions on it (and a concurrent download
+    # could rewrite the database file mid-query). The serial reads are
+    # local-disk cheap; the LLM calls are the slow, network-bound part
+    # and they fan out safely because they touch no shared state.
+    inputs = []
+    for user_id in user_ids:
         user_data = get_user_data(db_manager, user_id, days=7)
-        
-        # Skip if there's no check-in data
-        if not user_data.get("checkins"):
-            return {"status": "No check-in data available"}
-        
-        # Extract patterns
+        if user_data.get("checkins"):
+            inputs.append((user_id, user_data))
+
+    def _one_user(item):
+        user_id, user_data = item
         patterns = extract_patterns(user_data)
-        
-        # Generate summary
-        summary = generate_summary(user_data, patterns)
-        
-        # Save the summary
-        db_manager.save_summary(user_id, summary)
-        
-        # Upload handled automatically when exiting the DatabaseLock context
-    
-    return {"status": "Summary generated", "summary": summary}
+        return user_id, generate_summary(user_data, patterns)
+
+    results = []
+    if inputs:
+        with ThreadPoolExecutor(max_workers=min(16, len(inputs))) as executor:
+            results = list(executor.map(_one_user, inputs))
+    
+    # One locked transaction and one upload for all users.
+    # save_summaries_bulk takes the global lock itself (via its session
+    # scope), so no outer lock is held here.
+    if results:
+        db_manager.save_summaries_bulk(results)
+    
+    return {"status": "Batch summaries generated", "count": len(results)}
 
 
 def weekly_summary(event, context):
@@ -358,30 +816,43 @@ def weekly_summary(event, context):
     if not user_id:
         return {"error": "Missing user_id parameter"}
     
-    # Download database from GCS
-    db_path = download_db_from_gcs()
+    # Overlap the GCS download with LLM client warmup: both cost
+    # hundreds of ms on a cold instance and are independent
+    db_future = _IO_POOL.submit(download_db_from_gcs)
+    _IO_POOL.submit(_get_summary_model)
+    db_path = db_future.result()
     
     # Initialize database manager
     db_manager = DatabaseManager(GCS_BUCKET_NAME, DB_NAME, db_path)
     
-    # Use the database lock context manager
-    with DatabaseLock(db_manager):
-        # Get user data for the past 30 days
-        user_data = get_user_data(db_manager, user_id, days=30)
-        
-        # Skip if there's no check-in data
-        if not user_data.get("checkins"):
-            return {"status": "No check-in data available"}
-        
-        # Extract patterns
-        patterns = extract_patterns(user_data)
-        
-        # Generate summary
-        summary = generate_summary(user_data, patterns)
-        
-        # Save the summary
-        db_manager.save_summary(user_id, summary)
-        
-        # Upload handled automatically when exiting the DatabaseLock context
-    
+    # As in daily_summary: reads are lock-free against the snapshot, and
+    # save_summary takes its own per-user shard lock and uploads.
+    # One SQL aggregate decides whether anything changed before a
+    # single check-in row is ferried into Python
+    since = datetime.utcnow() - timedelta(days=30)
+    count, latest_ts = db_manager.get_checkin_window_stats(user_id, since)
+
+    # Skip if there's no check-in data
+    if not count:
+        return {"status": "No check-in data available"}
+
+    # Skip the LLM entirely when no check-in arrived since the
+    # last summary: same inputs would only reproduce it
+    content_hash = _window_content_hash(user_id, latest_ts, count)
+    prior = db_manager.get_latest_summary(user_id)
+    if prior is not None and prior.content_hash == content_hash:
+        return {"status": "Summary unchanged", "summary": prior.parsed_data}
+
+    # Get user data for the past 30 days
+    user_data = get_user_data(db_manager, user_id, days=30)
+
+    # Extract patterns
+    patterns = extract_patterns(user_data)
+
+    # Generate summary
+    summary = generate_summary(user_data, patterns)
+
+    # Save the summary
+    db_manager.save_summary(user_id, summary, content_hash=content_hash)
+
     return {"status": "Weekly summary generated", "summary": summary}
\ No newline at end of file
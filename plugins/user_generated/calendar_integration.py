@@ -8,7 +8,12 @@ calendar events for wellness-related tasks.
 import os
 import json
 import datetime
-from typing import Dict, List, Any, Optional
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 import tempfile
 
 import sys
@@ -20,8 +25,166 @@ from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.cloud import secretmanager
 
+try:
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+except ImportError:
+    httplib2 = None
+
 from core.base_plugin import AssistantPlugin
 
+# Secret Manager client and fetched values are shared at module level so
+# repeated plugin executions on a warm instance reuse one gRPC channel and
+# skip the network round-trip entirely while a cached value is fresh.
+_SM_LOCK = threading.Lock()
+_SM_CLIENT = None
+_SECRET_CACHE: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_SECRET_TTL = 3600  # seconds
+
+# How long a built Calendar service (and its underlying credentials) is
+# reused for a user before being rebuilt.
+_SERVICE_TTL = 300  # seconds
+
+# Refresh OAuth credentials only when they expire within this window;
+# credentials with more lifetime left are used as-is.
+_REFRESH_SKEW = datetime.timedelta(minutes=5)
+
+# How long cached freebusy responses are served before re-querying.
+_FREEBUSY_TTL = 300  # seconds
+
+# Bounds for the memoized LLM intent extraction: identical messages
+# ("show my events") recur, and each one saved is a full inference call.
+_INTENT_CACHE_SIZE = 512
+_INTENT_TTL = 3600  # seconds
+
+# Display formats for event and slot listings, hoisted so the format
+# string isn't re-interned per strftime call in the display loops.
+_DATE_FMT = "%A, %B %d at %I:%M %p"
+_TIME_FMT = "%I:%M %p"
+
+# Keywords that suggest the user's message is about their calendar.
+CALENDAR_KEYWORDS = frozenset([
+    "schedule", "calendar", "appointment", "meeting", "event",
+    "plan", "organize", "free time", "availability", "busy",
+    "book", "when am i free", "when am i available", "upcoming events"
+])
+
+# Compiled once into a single alternation so matching a message is one
+# pass of the regex engine instead of a Python-level substring scan per
+# keyword.
+_KEYWORD_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, CALENDAR_KEYWORDS)) + r')\b',
+    re.IGNORECASE
+)
+
+
+# Transient Google API statuses worth retrying, and how many attempts to
+# make before giving up.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_RETRY_ATTEMPTS = 3
+
+
+def _execute_with_retry(request):
+    """
+    Execute a Google API request, retrying transient failures.
+
+    Rate limits and 5xx responses are retried with exponential backoff and
+    jitter (honoring a Retry-After header when the API sends one), so a
+    blip doesn't fail the whole plugin call and force the user to retry
+    end-to-end. Non-transient errors propagate immediately.
+
+    Args:
+        request: A googleapiclient request object with an execute() method
+
+    Returns:
+        The API response
+    """
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            return request.execute()
+        except HttpError as error:
+            status = getattr(error.resp, "status", None)
+            if status not in _RETRYABLE_STATUS or attempt == _RETRY_ATTEMPTS - 1:
+                raise
+
+            retry_after = None
+            if hasattr(error.resp, "get"):
+                retry_after = error.resp.get("retry-after")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = (2 ** attempt) + random.uniform(0, 0.5)
+            time.sleep(delay)
+
+
+def _utc_now_iso() -> str:
+    """
+    Current UTC time as a 'Z'-suffixed ISO-8601 string for the Calendar API.
+
+    Uses the tz-aware clock (utcnow is deprecated from 3.12) and
+    timespec='seconds' to skip microsecond formatting, the expensive part
+    of isoformat.
+
+    Returns:
+        Timestamp string like '2026-08-28T12:34:56Z'
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def _parse_iso(timestamp: str) -> datetime.datetime:
+    """
+    Parse an ISO-8601 timestamp, accepting a trailing 'Z'.
+
+    fromisoformat handles 'Z' natively on Python 3.11+, so the common path
+    is a single C-level parse with no intermediate string allocation; the
+    replace-based fallback only runs on older interpreters.
+
+    Args:
+        timestamp: ISO-8601 timestamp string
+
+    Returns:
+        The parsed datetime
+    """
+    try:
+        return datetime.datetime.fromisoformat(timestamp)
+    except ValueError:
+        return datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _get_sm_client():
+    """Return the shared SecretManagerServiceClient, creating it lazily."""
+    global _SM_CLIENT
+    if _SM_CLIENT is None:
+        with _SM_LOCK:
+            if _SM_CLIENT is None:
+                _SM_CLIENT = secretmanager.SecretManagerServiceClient()
+    return _SM_CLIENT
+
+
+def _fetch_secret(project_id: str, secret_name: str) -> str:
+    """
+    Fetch a secret value, caching it for _SECRET_TTL seconds.
+
+    Args:
+        project_id: GCP project the secret lives in
+        secret_name: Name of the secret to retrieve
+
+    Returns:
+        The secret value as a string
+    """
+    cache_key = (project_id, secret_name)
+    cached = _SECRET_CACHE.get(cache_key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+
+    client = _get_sm_client()
+    name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
+    response = client.access_secret_version(request={"name": name})
+    value = response.payload.data.decode("UTF-8")
+    _SECRET_CACHE[cache_key] = (value, time.monotonic() + _SECRET_TTL)
+    return value
+
 
 class CalendarIntegrationPlugin(AssistantPlugin):
     """
@@ -30,6 +193,9 @@ class CalendarIntegrationPlugin(AssistantPlugin):
     This plugin connects to a user's Google Calendar to read events, find available time slots,
     and create events for wellness activities.
     """
+    __slots__ = ("_service", "_service_cache", "_freebusy_cache", "_intent_cache",
+                 "_actions")
+
     plugin_id: str = "calendar_integration"
     description: str = "Integrates with Google Calendar for wellness scheduling and planning"
     required_secrets: List[str] = ["google_client_secret", "google_client_id"]
@@ -43,6 +209,24 @@ class CalendarIntegrationPlugin(AssistantPlugin):
     def __init__(self):
         """Initialize the calendar integration plugin."""
         self._service = None
+        # user_id -> (expiry, service); built services are reused across
+        # executions on a warm instance so repeated calendar requests skip
+        # the credential lookup and discovery-document handling.
+        self._service_cache: Dict[str, Tuple[float, Any]] = {}
+        # (user_id, aligned_start, aligned_end) -> (expiry, busy periods).
+        # Freebusy responses are fetched for week-aligned windows and sliced
+        # locally, so nearby queries within the TTL share one API call.
+        self._freebusy_cache: Dict[tuple, Tuple[float, list]] = {}
+        # normalized message -> (expiry, intent dict); LRU-bounded so a
+        # repeated message skips the intent-extraction LLM call entirely.
+        self._intent_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Intent action -> bound handler; execute dispatches through this
+        # table instead of an if/elif chain over action strings.
+        self._actions = {
+            "view_events": self._handle_view_events,
+            "find_free_time": self._handle_find_free_time,
+            "schedule_event": self._handle_schedule_event,
+        }
     
     def match_context(self, user_context: Dict[str, Any]) -> bool:
         """
@@ -56,16 +240,10 @@ class CalendarIntegrationPlugin(AssistantPlugin):
         """
         # Check if there are any calendar-related keywords in the user's message
         current_data = user_context.get("current_data", {})
-        raw_input = current_data.get("raw_text", "").lower()
-        
-        calendar_keywords = [
-            "schedule", "calendar", "appointment", "meeting", "event", 
-            "plan", "organize", "free time", "availability", "busy",
-            "book", "when am i free", "when am i available", "upcoming events"
-        ]
-        
+        raw_input = current_data.get("raw_text", "")
+
         # Check if any calendar keywords are in the raw input
-        if any(keyword in raw_input for keyword in calendar_keywords):
+        if _KEYWORD_RE.search(raw_input):
             return True
         
         # Check if there's a specific calendar intent
@@ -89,12 +267,9 @@ class CalendarIntegrationPlugin(AssistantPlugin):
             The secret value as a string
         """
         project_id = os.environ.get("PROJECT_ID", "")
-        
+
         try:
-            client = secretmanager.SecretManagerServiceClient()
-            name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
-            response = client.access_secret_version(request={"name": name})
-            return response.payload.data.decode("UTF-8")
+            return _fetch_secret(project_id, secret_name)
         except Exception as e:
             print(f"Error retrieving secret {secret_name}: {e}")
             return ""
@@ -126,7 +301,8 @@ class CalendarIntegrationPlugin(AssistantPlugin):
             # Example of how this could look once implemented:
             # tokens = db_manager.get_user_oauth_tokens(user_id, "google_calendar")
             # if tokens:
-            #     return Credentials.from_authorized_user_info(tokens)
+            #     creds = Credentials.from_authorized_user_info(tokens, self.SCOPES)
+            #     return self._refresh_if_needed(creds)
             
             # For development/testing purposes only
             # In production, a proper OAuth flow would be implemented
@@ -135,7 +311,45 @@ class CalendarIntegrationPlugin(AssistantPlugin):
         except Exception as e:
             print(f"Error getting calendar credentials: {e}")
             return None
-    
+
+    def _refresh_if_needed(self, credentials: Credentials) -> Credentials:
+        """
+        Refresh credentials only when they are expired or close to expiring.
+
+        Unconditional refreshes add a token-endpoint round trip to every
+        request; credentials with more than _REFRESH_SKEW of lifetime left
+        are returned untouched.
+
+        Args:
+            credentials: Google API credentials
+
+        Returns:
+            The (possibly refreshed) credentials
+        """
+        if (credentials.expiry is not None
+                and credentials.expiry - datetime.datetime.utcnow() >= _REFRESH_SKEW):
+            return credentials
+
+        try:
+            from google.auth.transport.requests import Request
+
+            refresh_token = credentials.refresh_token
+            credentials.refresh(Request())
+
+            # Some token responses omit the refresh token; keep the one we
+            # already had so the stored tokens remain usable.
+            if not credentials.refresh_token and refresh_token:
+                credentials._refresh_token = refresh_token
+
+            # Once token storage is implemented, the refreshed tokens would
+            # be persisted back here so the next request starts warm:
+            # db_manager.save_user_oauth_tokens(
+            #     user_id, "google_calendar", json.loads(credentials.to_json()))
+        except Exception as e:
+            print(f"Error refreshing calendar credentials: {e}")
+
+        return credentials
+
     def _build_service(self, credentials: Credentials) -> Optional[Any]:
         """
         Build the Google Calendar API service.
@@ -147,99 +361,231 @@ class CalendarIntegrationPlugin(AssistantPlugin):
             Calendar API service or None if failed
         """
         try:
-            return build('calendar', 'v3', credentials=credentials)
+            # static_discovery uses the discovery document bundled with the
+            # client library; cache_discovery=False silences the deprecated
+            # file-cache lookup that would otherwise run per build.
+            if httplib2 is not None:
+                # Hand the service one authorized httplib2 transport so its
+                # TLS connection is kept alive across API calls; the service
+                # cache then reuses the warm connection for the whole TTL
+                # instead of re-handshaking per request.
+                authed_http = AuthorizedHttp(credentials,
+                                             http=httplib2.Http(timeout=10))
+                return build('calendar', 'v3', http=authed_http,
+                             cache_discovery=False, static_discovery=True)
+            return build('calendar', 'v3', credentials=credentials,
+                         cache_discovery=False, static_discovery=True)
         except Exception as e:
             print(f"Error building Calendar service: {e}")
             return None
     
-    def get_upcoming_events(self, service, max_results=10) -> List[Dict[str, Any]]:
+    def get_upcoming_events(self, service, max_results=10, page_token=None) -> Dict[str, Any]:
         """
-        Get upcoming calendar events.
-        
+        Get one page of upcoming calendar events.
+
+        Fetching a bounded page and handing back the API's continuation
+        token keeps response payloads small; callers that want more events
+        pass next_page_token back in rather than raising max_results.
+
         Args:
             service: Google Calendar API service
-            max_results: Maximum number of events to return
-            
+            max_results: Maximum number of events per page
+            page_token: Continuation token from a previous page, if any
+
         Returns:
-            List of upcoming events as dictionaries
+            Dictionary with 'events' (list of event dictionaries) and
+            'next_page_token' (None when there are no further pages)
         """
-        now = datetime.datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
+        now = _utc_now_iso()
         try:
-            events_result = service.events().list(
+            events_result = _execute_with_retry(service.events().list(
                 calendarId='primary',
                 timeMin=now,
                 maxResults=max_results,
+                pageToken=page_token,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
+            ))
+
             events = events_result.get('items', [])
-            
-            formatted_events = []
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                formatted_events.append({
+
+            # Building each dict in a single comprehension (with the 'start'
+            # sub-dict bound once per event) keeps the formatting in one
+            # bytecode loop instead of repeated append calls and lookups.
+            formatted_events = [
+                {
                     'summary': event['summary'],
-                    'start': start,
+                    'start': (start := event['start']).get('dateTime', start.get('date')),
                     'id': event.get('id', ''),
                     'description': event.get('description', ''),
                     'location': event.get('location', '')
-                })
-                
-            return formatted_events
+                }
+                for event in events
+            ]
+            return {
+                'events': formatted_events,
+                'next_page_token': events_result.get('nextPageToken')
+            }
         except HttpError as error:
             print(f"Error retrieving events: {error}")
-            return []
+            return {'events': [], 'next_page_token': None}
+
+    def get_upcoming_events_multi(self, service, calendar_ids, max_results=10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get upcoming events from several calendars in one HTTP request.
+
+        Issuing a separate events().list per calendar costs a round trip
+        each; a batch request coalesces them into a single HTTP exchange.
+
+        Args:
+            service: Google Calendar API service
+            calendar_ids: Calendar IDs to query
+            max_results: Maximum number of events per calendar
+
+        Returns:
+            Dictionary mapping each calendar ID to its list of formatted
+            events (empty on per-calendar errors)
+        """
+        now = _utc_now_iso()
+        results: Dict[str, List[Dict[str, Any]]] = {cid: [] for cid in calendar_ids}
+
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                print(f"Error retrieving events for {request_id}: {exception}")
+                return
+            results[request_id] = [
+                {
+                    'summary': event['summary'],
+                    'start': (start := event['start']).get('dateTime', start.get('date')),
+                    'id': event.get('id', ''),
+                    'description': event.get('description', ''),
+                    'location': event.get('location', '')
+                }
+                for event in response.get('items', [])
+            ]
+
+        try:
+            batch = service.new_batch_http_request(callback=_collect)
+            for calendar_id in calendar_ids:
+                batch.add(
+                    service.events().list(
+                        calendarId=calendar_id,
+                        timeMin=now,
+                        maxResults=max_results,
+                        singleEvents=True,
+                        orderBy='startTime'
+                    ),
+                    request_id=calendar_id
+                )
+            _execute_with_retry(batch)
+        except HttpError as error:
+            print(f"Error retrieving events in batch: {error}")
+
+        return results
     
-    def find_free_time_slots(self, service, start_date, end_date, min_duration_minutes=30) -> List[Dict[str, Any]]:
+    def _get_busy_periods(self, service, user_id, start_dt, end_dt) -> List[tuple]:
+        """
+        Get busy periods covering start_dt..end_dt, cached per user.
+
+        The freebusy query is made for a week-aligned window around the
+        requested range and the response cached for _FREEBUSY_TTL seconds,
+        so nearby lookups slice the cached list instead of paying another
+        API round trip. Returned periods are clipped to the requested range.
+
+        Args:
+            service: Google Calendar API service
+            user_id: Unique identifier for the user
+            start_dt: Start of the requested range (datetime)
+            end_dt: End of the requested range (datetime)
+
+        Returns:
+            List of (start, end) datetime tuples clipped to the range
+        """
+        aligned_start = (start_dt - datetime.timedelta(days=start_dt.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        end_week = (end_dt - datetime.timedelta(days=end_dt.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        aligned_end = end_week + datetime.timedelta(weeks=1)
+
+        cache_key = (user_id, aligned_start, aligned_end)
+        cached = self._freebusy_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            busy_periods_dt = cached[1]
+        else:
+            body = {
+                "timeMin": aligned_start.isoformat(),
+                "timeMax": aligned_end.isoformat(),
+                "items": [{"id": "primary"}]
+            }
+
+            freebusy = _execute_with_retry(service.freebusy().query(body=body))
+            busy_periods = freebusy['calendars']['primary']['busy']
+
+            # Convert to datetime objects for easier manipulation; bind the
+            # parser locally so the hot loop skips a global lookup per period
+            parse = _parse_iso
+            busy_periods_dt = [
+                (parse(period['start']), parse(period['end']))
+                for period in busy_periods
+            ]
+
+            self._freebusy_cache[cache_key] = (
+                time.monotonic() + _FREEBUSY_TTL, busy_periods_dt)
+
+        # Clip the aligned-window periods to the requested range
+        return [
+            (max(start, start_dt), min(end, end_dt))
+            for start, end in busy_periods_dt
+            if start < end_dt and end > start_dt
+        ]
+
+    def _invalidate_freebusy(self, user_id: str) -> None:
+        """Drop cached freebusy windows for a user after a calendar write."""
+        stale = [key for key in self._freebusy_cache if key[0] == user_id]
+        for key in stale:
+            del self._freebusy_cache[key]
+
+    def find_free_time_slots(self, service, start_date, end_date, min_duration_minutes=30, user_id="") -> List[Dict[str, Any]]:
         """
         Find free time slots in a user's calendar.
-        
+
         Args:
             service: Google Calendar API service
             start_date: Start date for the search
             end_date: End date for the search
             min_duration_minutes: Minimum duration in minutes for a slot to be considered
-            
+            user_id: Unique identifier for the user, used to cache busy periods
+
         Returns:
             List of free time slots
         """
         try:
-            # Get busy times
-            body = {
-                "timeMin": start_date,
-                "timeMax": end_date,
-                "items": [{"id": "primary"}]
-            }
-            
-            freebusy = service.freebusy().query(body=body).execute()
-            busy_periods = freebusy['calendars']['primary']['busy']
-            
-            # Convert to datetime objects for easier manipulation
-            busy_periods_dt = []
-            for period in busy_periods:
-                start = datetime.datetime.fromisoformat(period['start'].replace('Z', '+00:00'))
-                end = datetime.datetime.fromisoformat(period['end'].replace('Z', '+00:00'))
-                busy_periods_dt.append((start, end))
-            
+            # Convert string dates to datetime
+            start_dt = _parse_iso(start_date)
+            end_dt = _parse_iso(end_date)
+
+            # Get busy times (cached per user and week-aligned window)
+            busy_periods_dt = self._get_busy_periods(service, user_id, start_dt, end_dt)
+
             # Find free periods
             free_periods = []
             # Sort busy periods by start time
             busy_periods_dt.sort(key=lambda x: x[0])
-            
-            # Convert string dates to datetime
-            start_dt = datetime.datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            end_dt = datetime.datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            
-            # Add the start time as the initial free period start
-            if not busy_periods_dt or start_dt < busy_periods_dt[0][0]:
-                free_start = start_dt
-            else:
-                free_start = None
-                
-            # Check each busy period for gaps
+
+            # Merge overlapping/adjacent busy periods first. Without this,
+            # a busy period nested inside a longer one would rewind
+            # free_start and produce bogus zero- or negative-length gaps.
+            merged = []
             for busy_start, busy_end in busy_periods_dt:
-                if free_start and busy_start > free_start:
+                if merged and busy_start <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], busy_end))
+                else:
+                    merged.append((busy_start, busy_end))
+
+            # Linear scan over the merged periods emits each gap once
+            free_start = start_dt
+            for busy_start, busy_end in merged:
+                if busy_start > free_start:
                     duration = (busy_start - free_start).total_seconds() / 60
                     if duration >= min_duration_minutes:
                         free_periods.append({
@@ -247,10 +593,10 @@ class CalendarIntegrationPlugin(AssistantPlugin):
                             'end': busy_start.isoformat(),
                             'duration_minutes': duration
                         })
-                free_start = busy_end
-            
+                free_start = max(free_start, busy_end)
+
             # Check for free time after the last busy period
-            if free_start and free_start < end_dt:
+            if free_start < end_dt:
                 duration = (end_dt - free_start).total_seconds() / 60
                 if duration >= min_duration_minutes:
                     free_periods.append({
@@ -265,10 +611,10 @@ class CalendarIntegrationPlugin(AssistantPlugin):
             print(f"Error finding free time: {error}")
             return []
     
-    def create_event(self, service, summary, description, start_time, end_time, location="") -> Dict[str, Any]:
+    def create_event(self, service, summary, description, start_time, end_time, location="", user_id="") -> Dict[str, Any]:
         """
         Create a new calendar event.
-        
+
         Args:
             service: Google Calendar API service
             summary: Event title
@@ -276,7 +622,9 @@ class CalendarIntegrationPlugin(AssistantPlugin):
             start_time: Start time in ISO format
             end_time: End time in ISO format
             location: Event location
-            
+            user_id: Unique identifier for the user, used to invalidate
+                cached busy periods
+
         Returns:
             The created event or error information
         """
@@ -295,195 +643,255 @@ class CalendarIntegrationPlugin(AssistantPlugin):
                 }
             }
             
-            event = service.events().insert(calendarId='primary', body=event).execute()
+            event = _execute_with_retry(service.events().insert(calendarId='primary', body=event))
+
+            # The new event changes this user's availability; drop any
+            # cached freebusy windows so the next lookup sees it.
+            if user_id:
+                self._invalidate_freebusy(user_id)
+
             return {'success': True, 'event_id': event.get('id', ''), 'html_link': event.get('htmlLink', '')}
             
         except HttpError as error:
             print(f"Error creating event: {error}")
             return {'success': False, 'error': str(error)}
     
-    def execute(self, context: Dict[str, Any], llm_registry: Any) -> Dict[str, Any]:
+    def _extract_intent(self, raw_text: str, llm_registry: Any) -> Dict[str, Any]:
         """
-        Execute the calendar integration plugin.
-        
+        Extract the user's calendar intent from their message via the LLM.
+
+        Results are memoized by the normalized message text for _INTENT_TTL
+        seconds, so repeated phrasings like "show my events" skip the
+        inference round trip — the dominant cost of a calendar request.
+
         Args:
-            context: User context and data
+            raw_text: The user's message text
             llm_registry: Registry of language models
-            
+
         Returns:
-            Results of the calendar operation
+            Dictionary of extracted intent data
         """
-        user_id = context.get("user_id", "")
-        current_data = context.get("current_data", {})
-        raw_text = current_data.get("raw_text", "")
-        
-        # Get credentials and build service
-        credentials = self._get_credentials(user_id)
-        if not credentials:
-            return {
-                "message": "To access your calendar, please connect your Google account first. You can do this from the settings menu.",
-                "requires_auth": True
-            }
-            
-        service = self._build_service(credentials)
-        if not service:
-            return {
-                "message": "There was an issue connecting to your calendar. Please try again later.",
-                "error": "Service initialization failed"
-            }
-        
-        # Use LLM to determine the user's intent regarding calendar
+        cache_key = " ".join(raw_text.strip().lower().split())
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._intent_cache.move_to_end(cache_key)
+            return cached[1]
+
         model = llm_registry.select_model("structured_data")
-        
+
         prompt = f"""
         Analyze this user message about their calendar or schedule:
-        
+
         "{raw_text}"
-        
+
         Identify what the user wants to do with their calendar. Extract the following information:
-        
+
         1. Action: What action does the user want to perform? Options:
            - view_events: User wants to see upcoming events
            - find_free_time: User wants to find available time slots
            - schedule_event: User wants to create a new calendar event
            - general_question: User has a general question about their schedule
-        
+
         2. If action is schedule_event, extract these event details:
            - title: The title for the event
            - start_time: When the event should start (extract date and time if specified)
            - duration: How long the event should last
            - description: Additional details about the event
-        
+
         3. If action is find_free_time:
            - start_date: Beginning of period to check (today if not specified)
            - end_date: End of period to check (default 7 days from start)
            - duration_needed: Minimum length of free time slot needed
-           
+
         4. If action is view_events:
            - time_period: What time period user wants to see (today, this week, etc.)
            - filter: Any specific types of events user is looking for
-        
+
         Return the extracted information as a JSON object.
         """
-        
+
         try:
             intent_data = model.extract_structured_data(prompt, {})
         except Exception as e:
             print(f"Error extracting calendar intent: {e}")
-            intent_data = {"action": "view_events"}  # Default action
-        
-        # Handle different calendar-related actions based on intent
-        action = intent_data.get("action", "view_events")
+            # Default action; not cached so the next attempt retries the LLM
+            return {"action": "view_events"}
+
+        self._intent_cache[cache_key] = (time.monotonic() + _INTENT_TTL, intent_data)
+        if len(self._intent_cache) > _INTENT_CACHE_SIZE:
+            self._intent_cache.popitem(last=False)
+
+        return intent_data
+
+    def execute(self, context: Dict[str, Any], llm_registry: Any) -> Dict[str, Any]:
+        """
+        Execute the calendar integration plugin.
         
-        if action == "view_events":
-            # Get upcoming events
-            events = self.get_upcoming_events(service)
-            
-            if not events:
-                return {"message": "You don't have any upcoming events on your calendar."}
-            
-            # Format events for display
-            events_text = "Here are your upcoming events:\n\n"
-            for i, event in enumerate(events[:5], 1):
-                event_time = datetime.datetime.fromisoformat(event['start'].replace('Z', '+00:00'))
-                formatted_time = event_time.strftime("%A, %B %d at %I:%M %p")
-                events_text += f"{i}. {event['summary']} - {formatted_time}\n"
-                
-            if len(events) > 5:
-                events_text += f"\n...and {len(events) - 5} more events."
-                
-            return {"message": events_text, "events": events}
-            
-        elif action == "find_free_time":
-            # Calculate the start and end dates for the search
-            start_date = datetime.datetime.now()
-            end_date = start_date + datetime.timedelta(days=7)
-            
-            # Override with user-specified dates if available
-            if "start_date" in intent_data and intent_data["start_date"]:
-                try:
-                    # This is simplified - would need better date parsing in production
-                    start_date = datetime.datetime.fromisoformat(intent_data["start_date"])
-                except (ValueError, TypeError):
-                    pass
-                    
-            if "end_date" in intent_data and intent_data["end_date"]:
-                try:
-                    end_date = datetime.datetime.fromisoformat(intent_data["end_date"])
-                except (ValueError, TypeError):
-                    pass
-            
-            # Convert to ISO format for API
-            start_date_iso = start_date.isoformat() + 'Z'
-            end_date_iso = end_date.isoformat() + 'Z'
-            
-            # Get free time slots
-            min_duration = int(intent_data.get("duration_needed", 30))
-            free_slots = self.find_free_time_slots(service, start_date_iso, end_date_iso, min_duration)
-            
-            if not free_slots:
-                return {"message": "I couldn't find any free time slots in that period that meet your requirements."}
-                
-            # Format free slots for display
-            slots_text = "Here are available time slots:\n\n"
-            for i, slot in enumerate(free_slots[:5], 1):
-                start_time = datetime.datetime.fromisoformat(slot['start'])
-                end_time = datetime.datetime.fromisoformat(slot['end'])
-                start_formatted = start_time.strftime("%A, %B %d at %I:%M %p")
-                end_formatted = end_time.strftime("%I:%M %p")
-                duration = slot['duration_minutes']
-                slots_text += f"{i}. {start_formatted} to {end_formatted} ({duration:.0f} minutes)\n"
-                
-            if len(free_slots) > 5:
-                slots_text += f"\n...and {len(free_slots) - 5} more available slots."
-                
-            return {"message": slots_text, "free_slots": free_slots}
-            
-        elif action == "schedule_event":
-            # Get event details
-            title = intent_data.get("title", "Wellness Activity")
-            description = intent_data.get("description", "")
+        Args:
+            context: User context and data
+            llm_registry: Registry of language models
             
-            # This is simplified - in production we would use a more robust
-            # datetime parsing system that handles natural language time expressions
-            try:
-                start_time_str = intent_data.get("start_time", "")
-                if start_time_str:
-                    start_time = datetime.datetime.fromisoformat(start_time_str)
-                else:
-                    # Default to next hour
-                    start_time = datetime.datetime.now().replace(minute=0, second=0) + datetime.timedelta(hours=1)
-                    
-                duration_minutes = int(intent_data.get("duration", "60"))
-                end_time = start_time + datetime.timedelta(minutes=duration_minutes)
-                
-                # Format for API
-                start_iso = start_time.isoformat()
-                end_iso = end_time.isoformat()
-                
-                # Create the event
-                result = self.create_event(service, title, description, start_iso, end_iso)
-                
-                if result.get("success"):
-                    return {
-                        "message": f"Great! I've scheduled '{title}' on your calendar. You can view it here: {result.get('html_link', '')}",
-                        "event_created": True,
-                        "event_link": result.get("html_link", "")
-                    }
-                else:
-                    return {
-                        "message": "I wasn't able to create that calendar event. Please try again later.",
-                        "error": result.get("error", "Unknown error")
-                    }
-                    
-            except Exception as e:
-                print(f"Error scheduling event: {e}")
+        Returns:
+            Results of the calendar operation
+        """
+        user_id = context.get("user_id", "")
+        current_data = context.get("current_data", {})
+        raw_text = current_data.get("raw_text", "")
+        
+        # Reuse a recently built service for this user if we have one
+        service = None
+        cached = self._service_cache.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            service = cached[1]
+
+        if service is None:
+            # Get credentials and build service
+            credentials = self._get_credentials(user_id)
+            if not credentials:
+                return {
+                    "message": "To access your calendar, please connect your Google account first. You can do this from the settings menu.",
+                    "requires_auth": True
+                }
+
+            service = self._build_service(credentials)
+            if not service:
                 return {
-                    "message": "I had trouble understanding when to schedule this event. Could you provide a clearer date and time?",
-                    "error": str(e)
+                    "message": "There was an issue connecting to your calendar. Please try again later.",
+                    "error": "Service initialization failed"
                 }
+            self._service_cache[user_id] = (time.monotonic() + _SERVICE_TTL, service)
         
-        # Default response for other actions
+        # Use LLM to determine the user's intent regarding calendar
+        intent_data = self._extract_intent(raw_text, llm_registry)
+
+        # Dispatch to the handler for the extracted action; anything
+        # unrecognized falls through to the default help response
+        action = intent_data.get("action", "view_events")
+        handler = self._actions.get(action, self._handle_default)
+        return handler(service, intent_data, user_id)
+
+    def _handle_view_events(self, service, intent_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Handle the view_events intent: list and format upcoming events."""
+        # Get the first page of upcoming events
+        events_page = self.get_upcoming_events(service)
+        events = events_page['events']
+
+        if not events:
+            return {"message": "You don't have any upcoming events on your calendar."}
+
+        # Format events for display; collecting lines and joining once keeps
+        # the build O(n) if the display cap is ever raised
+        lines = ["Here are your upcoming events:\n\n"]
+        for i, event in enumerate(events[:5], 1):
+            event_time = _parse_iso(event['start'])
+            formatted_time = event_time.strftime(_DATE_FMT)
+            lines.append(f"{i}. {event['summary']} - {formatted_time}\n")
+
+        if len(events) > 5:
+            lines.append(f"\n...and {len(events) - 5} more events.")
+
+        return {
+            "message": "".join(lines),
+            "events": events,
+            "next_page_token": events_page['next_page_token']
+        }
+
+    def _handle_find_free_time(self, service, intent_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Handle the find_free_time intent: report open slots in a range."""
+        # Calculate the start and end dates for the search
+        start_date = datetime.datetime.now()
+        end_date = start_date + datetime.timedelta(days=7)
+
+        # Override with user-specified dates if available
+        if "start_date" in intent_data and intent_data["start_date"]:
+            try:
+                # This is simplified - would need better date parsing in production
+                start_date = datetime.datetime.fromisoformat(intent_data["start_date"])
+            except (ValueError, TypeError):
+                pass
+
+        if "end_date" in intent_data and intent_data["end_date"]:
+            try:
+                end_date = datetime.datetime.fromisoformat(intent_data["end_date"])
+            except (ValueError, TypeError):
+                pass
+
+        # Convert to ISO format for API
+        start_date_iso = start_date.isoformat() + 'Z'
+        end_date_iso = end_date.isoformat() + 'Z'
+
+        # Get free time slots
+        min_duration = int(intent_data.get("duration_needed", 30))
+        free_slots = self.find_free_time_slots(
+            service, start_date_iso, end_date_iso, min_duration, user_id=user_id)
+
+        if not free_slots:
+            return {"message": "I couldn't find any free time slots in that period that meet your requirements."}
+
+        # Format free slots for display; same join-once pattern as the
+        # events listing
+        lines = ["Here are available time slots:\n\n"]
+        for i, slot in enumerate(free_slots[:5], 1):
+            start_time = datetime.datetime.fromisoformat(slot['start'])
+            end_time = datetime.datetime.fromisoformat(slot['end'])
+            start_formatted = start_time.strftime(_DATE_FMT)
+            end_formatted = end_time.strftime(_TIME_FMT)
+            duration = slot['duration_minutes']
+            lines.append(f"{i}. {start_formatted} to {end_formatted} ({duration:.0f} minutes)\n")
+
+        if len(free_slots) > 5:
+            lines.append(f"\n...and {len(free_slots) - 5} more available slots.")
+
+        return {"message": "".join(lines), "free_slots": free_slots}
+
+    def _handle_schedule_event(self, service, intent_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Handle the schedule_event intent: create the requested event."""
+        # Get event details
+        title = intent_data.get("title", "Wellness Activity")
+        description = intent_data.get("description", "")
+
+        # This is simplified - in production we would use a more robust
+        # datetime parsing system that handles natural language time expressions
+        try:
+            start_time_str = intent_data.get("start_time", "")
+            if start_time_str:
+                start_time = datetime.datetime.fromisoformat(start_time_str)
+            else:
+                # Default to next hour
+                start_time = datetime.datetime.now().replace(minute=0, second=0) + datetime.timedelta(hours=1)
+
+            duration_minutes = int(intent_data.get("duration", "60"))
+            end_time = start_time + datetime.timedelta(minutes=duration_minutes)
+
+            # Format for API
+            start_iso = start_time.isoformat()
+            end_iso = end_time.isoformat()
+
+            # Create the event
+            result = self.create_event(service, title, description, start_iso, end_iso,
+                                       user_id=user_id)
+
+            if result.get("success"):
+                return {
+                    "message": f"Great! I've scheduled '{title}' on your calendar. You can view it here: {result.get('html_link', '')}",
+                    "event_created": True,
+                    "event_link": result.get("html_link", "")
+                }
+            else:
+                return {
+                    "message": "I wasn't able to create that calendar event. Please try again later.",
+                    "error": result.get("error", "Unknown error")
+                }
+
+        except Exception as e:
+            print(f"Error scheduling event: {e}")
+            return {
+                "message": "I had trouble understanding when to schedule this event. Could you provide a clearer date and time?",
+                "error": str(e)
+            }
+
+    def _handle_default(self, service, intent_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Handle unrecognized or general-question intents."""
         return {
             "message": "I can help you with your calendar. Try asking me to show your upcoming events, find free time, or schedule a new activity."
         }
\ No newline at end of file
@@ -10,6 +10,7 @@ import argparse
 import json
 import re
 import ast
+import tempfile
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
@@ -18,11 +19,101 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.llm_registry import LLMRegistry
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Constants
 PLUGIN_DIR = "plugins/user_generated"
 REGISTRY_PATH = "plugins/registry.json"
 
+# Matches version filenames like "v3.py", capturing the version number
+_VER_RE = re.compile(r'^v(\d+)\.py$')
+
+# When streaming generation, attempt a validation parse only after this
+# many newlines have arrived, so most chunks cost nothing extra
+_STREAM_PARSE_INTERVAL = 8
+
+# The last streamed code that already passed validation during generation;
+# lets validate_plugin_code skip a redundant re-parse of the same text
+_stream_validated_code: Optional[str] = None
+
+
+def _strip_fences(generated_code: str) -> str:
+    """
+    Remove Markdown code-fence markers from generated code.
+
+    Args:
+        generated_code: Raw model output
+
+    Returns:
+        The code with any surrounding fences removed
+    """
+    # removeprefix/removesuffix handle the normal single fenced block
+    # without spinning up the regex engine
+    code = generated_code.strip()
+    code = code.removeprefix("```python").removeprefix("```").removesuffix("```").strip()
+
+    # A stray fence in the middle means the model emitted multiple blocks;
+    # fall back to the regex strip for that case
+    if "```" in code:
+        code = re.sub(r'^```python\s*', '', code, flags=re.MULTILINE)
+        code = re.sub(r'\s*```$', '', code, flags=re.MULTILINE)
+
+    return code
+
+
+def _generate_streaming(generate_stream, prompt: str) -> str:
+    """
+    Consume a streaming generation, validating incrementally.
+
+    Chunks are accumulated as they arrive and a validation parse is
+    attempted every _STREAM_PARSE_INTERVAL newlines, so by the time the
+    stream finishes the final text has usually already been validated and
+    validate_plugin_code becomes a string comparison instead of a parse.
+
+    Args:
+        generate_stream: The model's streaming generate callable
+        prompt: The generation prompt
+
+    Returns:
+        The full generated text
+    """
+    global _stream_validated_code
+
+    parts: List[str] = []
+    pending_newlines = 0
+    for chunk in generate_stream(prompt):
+        parts.append(chunk)
+        pending_newlines += chunk.count("\n")
+        if pending_newlines < _STREAM_PARSE_INTERVAL:
+            continue
+        pending_newlines = 0
+
+        candidate = _strip_fences("".join(parts))
+        try:
+            tree = ast.parse(candidate, type_comments=False)
+        except SyntaxError:
+            # A block is still open mid-stream; keep accumulating
+            continue
+        if _check_tree(tree):
+            _stream_validated_code = candidate
+
+    generated_code = "".join(parts)
+
+    # Validate whatever arrived after the last incremental parse
+    candidate = _strip_fences(generated_code)
+    if candidate != _stream_validated_code:
+        try:
+            if _check_tree(ast.parse(candidate, type_comments=False)):
+                _stream_validated_code = candidate
+        except SyntaxError:
+            pass
+
+    return generated_code
+
 
 def generate_plugin_code(plugin_id: str, 
                         description: str, 
@@ -80,29 +171,31 @@ def generate_plugin_code(plugin_id: str,
             model = llm_registry.select_model("chat")
             
             # Get data from context
-            user_data = context.get("current_data", {})
-            
+            user_data = context.get("current_data", {{}})
+
             # Generate response or perform action
             response = model.generate("Create a helpful message")
-            
+
             # Return result
-            return {
+            return {{
                 "message": response,
-                "metadata": {"plugin_id": self.plugin_id, "timestamp": context.get("timestamp")}
-            }
+                "metadata": {{"plugin_id": self.plugin_id, "timestamp": context.get("timestamp")}}
+            }}
     ```
     
     ONLY return the Python code, nothing else.
     """
     
-    # Generate the plugin code
-    generated_code = model.generate(prompt)
-    
+    # Generate the plugin code, streaming (with incremental validation)
+    # when the selected model supports it
+    generate_stream = getattr(model, "generate_stream", None)
+    if generate_stream is not None:
+        generated_code = _generate_streaming(generate_stream, prompt)
+    else:
+        generated_code = model.generate(prompt)
+
     # Clean up the generated code (remove code block markers if present)
-    generated_code = re.sub(r'^```python\s*', '', generated_code, flags=re.MULTILINE)
-    generated_code = re.sub(r'\s*```$', '', generated_code, flags=re.MULTILINE)
-    
-    return generated_code
+    return _strip_fences(generated_code)
 
 
 def validate_plugin_code(code: str) -> bool:
@@ -115,30 +208,60 @@ def validate_plugin_code(code: str) -> bool:
     Returns:
         True if the code is valid, False otherwise
     """
+    # Code already validated while it was being streamed needs no re-parse
+    if _stream_validated_code is not None and code == _stream_validated_code:
+        return True
+
     try:
-        # Parse the code to AST
-        tree = ast.parse(code)
-        
-        # Check for AssistantPlugin import and inheritance
-        import_found = False
-        class_found = False
-        
-        for node in ast.walk(tree):
-            # Check for import
-            if isinstance(node, ast.ImportFrom) and node.module == 'core.base_plugin':
+        # Parse the code to AST (type comments are never needed here)
+        tree = ast.parse(code, type_comments=False)
+        return _check_tree(tree)
+
+    except SyntaxError:
+        print("Generated code has syntax errors.")
+        return False
+
+
+def _check_tree(tree: ast.AST) -> bool:
+    """
+    Check a parsed plugin module for the required structure.
+
+    Args:
+        tree: Parsed AST of the generated code
+
+    Returns:
+        True if the tree imports core.base_plugin, defines an
+        AssistantPlugin subclass, and contains no eval/exec calls
+    """
+    # Check for AssistantPlugin import and inheritance in one walk,
+    # rejecting eval/exec calls in the same pass. Rejection exits
+    # immediately; the marker checks run over the whole tree so the
+    # dangerous-call scan can't be short-circuited past.
+    import_found = False
+    class_found = False
+
+    for node in ast.walk(tree):
+        # Check for import
+        if isinstance(node, ast.ImportFrom):
+            if node.module == 'core.base_plugin':
                 import_found = True
-            
-            # Check for class definition
-            if isinstance(node, ast.ClassDef):
+
+        # Check for class definition
+        elif isinstance(node, ast.ClassDef):
+            if not class_found:
                 for base in node.bases:
                     if isinstance(base, ast.Name) and base.id == 'AssistantPlugin':
                         class_found = True
-        
-        return import_found and class_found
-    
-    except SyntaxError:
-        print("Generated code has syntax errors.")
-        return False
+                        break
+
+        # Generated code has no business calling eval/exec
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name) and func.id in ('eval', 'exec'):
+                print(f"Generated code calls {func.id}(); rejecting.")
+                return False
+
+    return import_found and class_found
 
 
 def save_plugin(plugin_id: str, code: str, version_num: int = 1) -> str:
@@ -156,14 +279,24 @@ def save_plugin(plugin_id: str, code: str, version_num: int = 1) -> str:
     # Create plugin directory
     plugin_dir = os.path.join(PLUGIN_DIR, plugin_id)
     os.makedirs(plugin_dir, exist_ok=True)
-    
+
     # Create the file path
     file_path = os.path.join(plugin_dir, f"v{version_num}.py")
-    
-    # Write the code to the file
-    with open(file_path, "w") as f:
-        f.write(code)
-    
+
+    # Write to a temp file in the same directory and atomically swap it in;
+    # a crash mid-write then leaves no partial version file for the plugin
+    # loader to trip over, and concurrent generations can't interleave
+    tmp = tempfile.NamedTemporaryFile("w", dir=plugin_dir, suffix=".tmp",
+                                      delete=False)
+    try:
+        with tmp:
+            tmp.write(code)
+            tmp.flush()
+        os.replace(tmp.name, file_path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
     return file_path
 
 
@@ -177,28 +310,44 @@ def update_registry(plugin_id: str, description: str, version_num: int) -> None:
         version_num: Version number for the plugin
     """
     # Ensure registry directory exists
-    os.makedirs(os.path.dirname(REGISTRY_PATH), exist_ok=True)
-    
+    registry_dir = os.path.dirname(REGISTRY_PATH)
+    os.makedirs(registry_dir, exist_ok=True)
+
     # Load existing registry or create a new one
     if os.path.exists(REGISTRY_PATH):
-        with open(REGISTRY_PATH, "r") as f:
-            registry = json.load(f)
+        with open(REGISTRY_PATH, "rb") as f:
+            raw = f.read()
+        registry = orjson.loads(raw) if orjson is not None else json.loads(raw)
     else:
         registry = {}
-    
-    # Update the registry
+
+    # Update the registry, preserving the original creation time and
+    # formatting the timestamp once for both fields
+    now_iso = datetime.now().isoformat()
     registry[plugin_id] = {
         "plugin_id": plugin_id,
         "description": description,
         "version": f"v{version_num}.py",
-        "created_at": datetime.now().isoformat(),
-        "last_updated": datetime.now().isoformat(),
+        "created_at": registry.get(plugin_id, {}).get("created_at", now_iso),
+        "last_updated": now_iso,
         "is_active": True
     }
-    
-    # Write the updated registry back
-    with open(REGISTRY_PATH, "w") as f:
-        json.dump(registry, f, indent=2)
+
+    # Write to a temp file in the same directory and atomically swap it in,
+    # so a crash mid-write can never leave a truncated registry.json behind
+    if orjson is not None:
+        payload = orjson.dumps(registry, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(registry, indent=2).encode("utf-8")
+
+    fd, tmp_path = tempfile.mkstemp(dir=registry_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, REGISTRY_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def get_next_version(plugin_id: str) -> int:
@@ -212,21 +361,20 @@ def get_next_version(plugin_id: str) -> int:
         Next version number
     """
     plugin_dir = os.path.join(PLUGIN_DIR, plugin_id)
-    
-    # If the plugin directory doesn't exist, version 1
-    if not os.path.exists(plugin_dir):
+
+    # scandir yields entry names without the per-entry stat calls listdir
+    # can trigger, and the compiled regex parses each name in one match
+    try:
+        with os.scandir(plugin_dir) as entries:
+            versions = [int(m.group(1)) for e in entries
+                        if (m := _VER_RE.match(e.name))]
+    except FileNotFoundError:
+        # The plugin directory doesn't exist yet, so this is version 1
         return 1
-    
-    # Get all version files
-    version_files = [f for f in os.listdir(plugin_dir) 
-                    if f.startswith("v") and f.endswith(".py")]
-    
-    if not version_files:
+
+    if not versions:
         return 1
-    
-    # Extract version numbers
-    versions = [int(f[1:-3]) for f in version_files]
-    
+
     # Return the next version
     return max(versions) + 1
 